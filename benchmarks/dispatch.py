@@ -0,0 +1,89 @@
+"""Benchmark do motor de despacho: matriz vetorizada vs. varredura original.
+
+Uso: python -m benchmarks.dispatch
+"""
+import time
+import numpy as np
+from types import SimpleNamespace
+
+from simulation.dispatch import build_score_matrix, solve_greedy, solve_hungarian
+
+
+SIZES = [(50, 5), (500, 50), (2000, 200), (5000, 500)]
+LEGACY_MAX_PAIRS = 500 * 50
+
+
+def make_scenario(n_orders, n_couriers, rng, map_size=(1400, 900)):
+    orders = [
+        SimpleNamespace(
+            pickup=(rng.uniform(50, map_size[0] - 50), rng.uniform(50, map_size[1] - 50)),
+            created=rng.uniform(0, 300),
+            base_priority=float(np.clip(rng.normal(2.0, 0.8), 0.5, 3.5)),
+        )
+        for _ in range(n_orders)
+    ]
+    couriers = [
+        SimpleNamespace(pos=np.array([rng.uniform(0, map_size[0]), rng.uniform(0, map_size[1])]))
+        for _ in range(n_couriers)
+    ]
+    return orders, couriers
+
+
+def legacy_assign(orders, couriers, now):
+    # Reprodução da varredura par a par usada antes do motor vetorizado
+    orders = list(orders)
+    free = list(couriers)
+    pairs = []
+    while orders and free:
+        best = (float('inf'), None, None)
+        for i, order in enumerate(orders):
+            wait_time = now - order.created
+            priority_bonus = -(order.base_priority - 2.0) * 30.0
+            for j, courier in enumerate(free):
+                dist = np.linalg.norm(courier.pos - np.array(order.pickup, dtype=float))
+                score = dist + wait_time * 5.0 + priority_bonus
+                if score < best[0]:
+                    best = (score, i, j)
+        pairs.append((orders.pop(best[1]), free.pop(best[2])))
+    return pairs
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    rng = np.random.default_rng(42)
+    now = 300.0
+    
+    try:
+        solve_hungarian(np.zeros((1, 1)))
+    except ImportError:
+        pass
+    
+    print(f"{'pedidos':>8} {'entreg.':>8} {'matriz':>10} {'guloso':>10} {'húngaro':>10} {'original':>10}")
+    for n_orders, n_couriers in SIZES:
+        orders, couriers = make_scenario(n_orders, n_couriers, rng)
+        
+        scores, t_matrix = timed(build_score_matrix, orders, couriers, now)
+        _, t_greedy = timed(solve_greedy, scores)
+        
+        try:
+            _, t_hungarian = timed(solve_hungarian, scores)
+            hungarian = f"{t_hungarian * 1000:9.1f}ms"
+        except ImportError:
+            hungarian = f"{'sem scipy':>11}"
+        
+        if n_orders * n_couriers <= LEGACY_MAX_PAIRS:
+            _, t_legacy = timed(legacy_assign, orders, couriers, now)
+            legacy = f"{t_legacy * 1000:9.1f}ms"
+        else:
+            legacy = f"{'-':>11}"
+        
+        print(f"{n_orders:>8} {n_couriers:>8} {t_matrix * 1000:9.1f}ms {t_greedy * 1000:9.1f}ms {hungarian} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
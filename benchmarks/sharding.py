@@ -0,0 +1,61 @@
+"""Benchmark de escalabilidade da simulação particionada: 1 a N processos.
+
+Uso: python -m benchmarks.sharding [N_MAX]
+"""
+import os
+import sys
+import time
+
+import config
+from simulation.environment import run_headless
+from simulation.replication import make_config
+from simulation.sharding import run_sharded
+
+
+# Cenário em escala de cidade: mapa 4x maior e demanda suficiente para manter a frota ocupada
+SCENARIO = dict(
+    SIM_TIME=1800.0,
+    NUM_COURIERS=400,
+    MAP_SIZE=(5600, 3600),
+    INTERARRIVAL_MEAN=0.08,
+    MAX_QUEUE_FORGIVE=200,
+    DISPATCH_SPATIAL_INDEX=True,
+    SPATIAL_CELL_SIZE=400.0,
+    VERBOSE=False,
+)
+
+
+def shard_counts(n_max):
+    counts = [1]
+    while counts[-1] * 2 <= n_max:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != n_max:
+        counts.append(n_max)
+    return counts
+
+
+def main():
+    n_max = int(sys.argv[1]) if len(sys.argv) > 1 else max(4, os.cpu_count() or 1)
+    cfg = make_config(config, **SCENARIO)
+
+    t0 = time.perf_counter()
+    _, _, _, _, metrics = run_headless(cfg)
+    baseline = time.perf_counter() - t0
+    print(f"núcleos disponíveis: {os.cpu_count()}")
+    print(f"sequencial: {baseline:.2f}s, {metrics['completed']} entregas, "
+          f"{cfg.SIM_TIME / baseline:.0f} s simulados/s")
+
+    print(f"\n{'regiões':>8} {'grade':>6} {'tempo':>8} {'speedup':>8} {'sim-s/s':>8} "
+          f"{'entregas':>9} {'sucesso':>8} {'repasses':>9}")
+    for n in shard_counts(n_max):
+        t0 = time.perf_counter()
+        run, _, _, _, metrics = run_sharded(cfg, n)
+        wall = time.perf_counter() - t0
+        success = metrics['completed'] / max(1, metrics['total_orders']) * 100
+        print(f"{n:>8} {run.grid[0]}×{run.grid[1]:<4} {wall:7.2f}s {baseline / wall:7.2f}x "
+              f"{cfg.SIM_TIME / wall:8.0f} {metrics['completed']:>9} {success:7.1f}% "
+              f"{run.courier_handovers + run.order_handovers:>9}")
+
+
+if __name__ == "__main__":
+    main()
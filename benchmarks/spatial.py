@@ -0,0 +1,70 @@
+"""Benchmark do índice espacial: manutenção + consulta vs. varredura de toda a frota.
+
+Uso: python -m benchmarks.spatial
+"""
+import time
+import numpy as np
+from types import SimpleNamespace
+
+from simulation.dispatch import build_score_matrix, solve_greedy, solve_greedy_indexed
+from simulation.spatial import GridIndex
+
+
+FLEET_SIZES = [100, 1000, 5000, 20000]
+FREE_FRACTION = 0.2
+ORDERS_PER_FREE = 0.5
+
+
+class FakeCourier:
+    def __init__(self, pos):
+        self.pos = pos
+
+
+def make_round(fleet_size, rng):
+    # Mapa cresce com a frota para manter densidade parecida com a de uma cidade
+    side = 1400.0 * np.sqrt(fleet_size / 2)
+    n_free = max(1, int(fleet_size * FREE_FRACTION))
+    n_orders = max(1, int(n_free * ORDERS_PER_FREE))
+    
+    couriers = [FakeCourier(rng.uniform(0, side, size=2)) for _ in range(n_free)]
+    orders = [
+        SimpleNamespace(pickup=tuple(rng.uniform(0, side, size=2)), created=rng.uniform(0, 60), base_priority=2.0)
+        for _ in range(n_orders)
+    ]
+    # Célula da ordem do espaçamento médio entre entregadores livres
+    cell_size = side / np.sqrt(n_free)
+    return couriers, orders, cell_size
+
+
+def main():
+    rng = np.random.default_rng(7)
+    now = 60.0
+    
+    print(f"{'frota':>7} {'livres':>7} {'pedidos':>8} {'varredura':>11} {'índice':>11} {'manutenção':>14}")
+    for fleet_size in FLEET_SIZES:
+        couriers, orders, cell_size = make_round(fleet_size, rng)
+        
+        t0 = time.perf_counter()
+        solve_greedy(build_score_matrix(orders, couriers, now))
+        t_brute = time.perf_counter() - t0
+        
+        index = GridIndex(cell_size)
+        t0 = time.perf_counter()
+        for c in couriers:
+            index.insert(c, c.pos)
+        t_insert = time.perf_counter() - t0
+        
+        t0 = time.perf_counter()
+        pairs = solve_greedy_indexed(orders, index, now)
+        t_index = time.perf_counter() - t0
+        
+        # Custo de manutenção por atualização (entregador que volta a ficar livre)
+        per_update = t_insert / len(couriers)
+        
+        print(f"{fleet_size:>7} {len(couriers):>7} {len(orders):>8} "
+              f"{t_brute * 1000:9.1f}ms {t_index * 1000:9.1f}ms {per_update * 1e6:11.2f}µs")
+        assert len(pairs) == min(len(orders), len(couriers))
+
+
+if __name__ == "__main__":
+    main()
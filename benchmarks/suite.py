@@ -0,0 +1,237 @@
+"""Suíte de benchmarks da simulação e da renderização, com comparação contra um baseline.
+
+Cada cenário (frota × demanda) roda em um processo novo e mede segundos simulados por
+segundo de relógio, eventos SimPy por segundo, pico de RSS e o tempo de Renderer.draw
+numa janela SDL "dummy" (sem display).
+
+Uso: python -m benchmarks.suite [--only 2,50] [--no-render] [--frame-budget 5]
+                                [--output ARQ] [--baseline ARQ] [--threshold 0.2]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import config
+from simulation import create_simulation, make_config
+
+
+# (entregadores, SIM_TIME): horizonte menor nas frotas grandes para a suíte caber em minutos
+FLEETS = [(2, 36000.0), (50, 3600.0), (500, 300.0), (5000, 30.0)]
+DEMANDS = ('normal', 'pico')
+# Instante dos quadros, em fração de SIM_TIME; a janela de pico sempre o cobre
+FRAME_AT = 0.6
+
+# Métrica -> True se maior é melhor
+METRICS = {
+    'sim_rate': True,
+    'events_per_s': True,
+    'peak_rss_mb': False,
+    'frame_ms': False,
+    'frame_p95_ms': False,
+}
+
+
+def scenario_config(n_couriers, sim_time, demand):
+    """Mesma demanda por entregador do config padrão, com pico cobrindo 35% do horizonte"""
+    return make_config(
+        config,
+        NUM_COURIERS=n_couriers,
+        SIM_TIME=sim_time,
+        INTERARRIVAL_MEAN=config.INTERARRIVAL_MEAN * config.NUM_COURIERS / n_couriers,
+        MAX_QUEUE_FORGIVE=max(config.MAX_QUEUE_FORGIVE, 10 * n_couriers),
+        DISPATCH_SPATIAL_INDEX=n_couriers >= 50,
+        PEAK_ENABLED=demand == 'pico',
+        PEAK_DURATION=0.35 * sim_time,
+        VERBOSE=False,
+        TRACE_PATH=None,
+        RESUME_FROM=None,
+        FRAME_PROFILE_PATH=None,
+    )
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def time_frames(cfg, env, couriers, orders_queue, metrics, n_frames, budget):
+    """Tempo de cada Renderer.draw sobre o mesmo estado da simulação.
+
+    Depois de um quadro de aquecimento, mede até `n_frames` quadros ou até `budget`
+    segundos, o que vier antes (no mínimo um quadro medido).
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    from visualization import Renderer
+
+    renderer = Renderer(cfg)
+    renderer.initialize()
+    start = time.perf_counter()
+    renderer.draw(env, couriers, orders_queue, metrics)
+    times = []
+    while len(times) < n_frames and (not times or time.perf_counter() - start < budget):
+        t0 = time.perf_counter()
+        renderer.draw(env, couriers, orders_queue, metrics)
+        times.append(time.perf_counter() - t0)
+    renderer.cleanup()
+    return np.array(times) * 1000
+
+
+def run_scenario(n_couriers, sim_time, demand, n_frames, frame_budget):
+    cfg = scenario_config(n_couriers, sim_time, demand)
+    env, couriers, orders_queue, all_orders, metrics = create_simulation(cfg)
+
+    t0 = time.perf_counter()
+    env.run(until=sim_time * FRAME_AT)
+    wall = time.perf_counter() - t0
+
+    frames = None
+    if n_frames:
+        frames = time_frames(cfg, env, couriers, orders_queue, metrics, n_frames, frame_budget)
+
+    t0 = time.perf_counter()
+    env.run(until=sim_time)
+    wall += time.perf_counter() - t0
+
+    events = env.processed_events()
+    rss = peak_rss_mb()
+    return {
+        'couriers': n_couriers,
+        'demand': demand,
+        'sim_time': sim_time,
+        'wall_s': round(wall, 4),
+        'events': events,
+        'orders': metrics['total_orders'],
+        'completed': metrics['completed'],
+        'sim_rate': round(sim_time / wall, 2),
+        'events_per_s': round(events / wall, 1),
+        'peak_rss_mb': None if rss is None else round(rss, 1),
+        'frames': 0 if frames is None else len(frames),
+        'frame_ms': None if frames is None else round(float(frames.mean()), 3),
+        'frame_p95_ms': None if frames is None else round(float(np.percentile(frames, 95)), 3),
+    }
+
+
+def run_suite(fleets, n_frames, frame_budget):
+    # Um processo novo por cenário, para que o pico de RSS seja só daquele cenário
+    ctx = multiprocessing.get_context('spawn')
+    results = {}
+    for n_couriers, sim_time in fleets:
+        for demand in DEMANDS:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                result = pool.submit(run_scenario, n_couriers, sim_time, demand, n_frames, frame_budget).result()
+            name = f"{n_couriers}-{demand}"
+            results[name] = result
+            print_result(name, result)
+    return results
+
+
+def _fmt(value, width, digits):
+    return f"{'-':>{width}}" if value is None else f"{value:{width}.{digits}f}"
+
+
+def print_header():
+    print(f"{'cenário':>12} {'tempo':>8} {'sim-s/s':>10} {'eventos/s':>11} {'RSS MB':>8} "
+          f"{'quadro ms':>10} {'p95 ms':>8} {'entregas':>9}")
+
+
+def print_result(name, r):
+    print(f"{name:>12} {r['wall_s']:7.2f}s {r['sim_rate']:10.1f} {r['events_per_s']:11.0f} "
+          f"{_fmt(r['peak_rss_mb'], 8, 1)} {_fmt(r['frame_ms'], 10, 2)} {_fmt(r['frame_p95_ms'], 8, 2)} "
+          f"{r['completed']:>9}", flush=True)
+
+
+def compare(results, baseline, threshold):
+    """Regressões acima de `threshold` (fração) em relação ao baseline"""
+    regressions = []
+    print(f"\n=== Comparação com o baseline (limite {threshold:.0%}) ===")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "REGRESSÃO" if worse > threshold else ""
+            print(f"{name:>12} {metric:>14} {old:12.2f} → {new:12.2f} {change:+8.1%} {flag}")
+            if worse > threshold:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de simulação e renderização do Flash Move")
+    parser.add_argument('--only', metavar='FROTAS',
+                        help="roda só as frotas indicadas, ex.: 2,50")
+    parser.add_argument('--frames', type=int, default=30,
+                        help="quadros de Renderer.draw medidos por cenário (padrão: 30)")
+    parser.add_argument('--frame-budget', type=float, default=5.0, metavar='SEGUNDOS',
+                        help="tempo máximo de desenho por cenário; mede menos quadros se estourar (padrão: 5)")
+    parser.add_argument('--no-render', action='store_true',
+                        help="mede só a simulação, sem pygame")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="arquivo JSON de resultados")
+    parser.add_argument('--baseline', metavar='ARQUIVO',
+                        help="JSON de uma execução anterior para comparar")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="piora relativa tolerada antes de falhar (padrão: 0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fleets = FLEETS
+    if args.only:
+        wanted = {int(n) for n in args.only.split(',')}
+        fleets = [(n, t) for n, t in FLEETS if n in wanted]
+
+    print_header()
+    results = run_suite(fleets, 0 if args.no_render else args.frames, args.frame_budget)
+
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'frames': 0 if args.no_render else args.frames,
+            'frame_budget': args.frame_budget,
+        },
+        'scenarios': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Resultados salvos em: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['scenarios']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressão(ões) acima de {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Sem regressões")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 SIM_TIME = 3600.0
 FRAME_DT = 0.5
 SEED = 42
+VERBOSE = True
+TRACE_PATH = None
+RESUME_FROM = None
+TIMELINE_BUCKET = 10.0
 
 INTERARRIVAL_MEAN = 15.0
 MAX_QUEUE_FORGIVE = 20
@@ -10,17 +14,40 @@ PEAK_ENABLED = True
 PEAK_DURATION = 120.0
 PEAK_MULTIPLIER = 5
 
+DEMAND_PROFILE = None
+DEMAND_PROFILE_PERIOD = None
+DEMAND_HOTSPOTS = None
+DEMAND_BACKGROUND_WEIGHT = 1.0
+
 ACCIDENT_PROBABILITY = 0.0008 
 
 NUM_COURIERS = 2
 SERVICE_SPEED = 80.0
+MOVEMENT_MODE = "analytic"
+DISPATCH_SOLVER = "greedy"
+DISPATCH_SPATIAL_INDEX = False
+SPATIAL_CELL_SIZE = 100.0
+
+ROAD_NETWORK = None
+ROAD_GRID_SPACING = 50.0
+ROAD_BLOCKED = 0.1
+ROAD_SLOW_ZONES = None
+ROAD_SEED = 0
+ROAD_CACHE_SIZE = 1024
+
+SHARDS = 1
+SHARD_WINDOW = 10.0
 
 MAP_SIZE = (1400, 900)
 SHOW_TRAILS = True
 SHOW_SHADOWS = True
 SHOW_PARTICLES = True
 BACKGROUND_IMAGE = None
+FONT_FACES = "Segoe UI,Arial"
+FONT_CACHE_PATH = "~/.cache/flash-move/fonts.json"
 FPS = 60
+FRAME_PROFILE_PATH = None
+FRAME_PROFILE_WINDOW = 120
 
 COLORS = {
     'background': (15, 18, 25),
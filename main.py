@@ -1,19 +1,47 @@
+import time
+_START = time.perf_counter()
+
 import sys
-import pygame
+import argparse
 import config
-import matplotlib.pyplot as plt
-import matplotlib
+import numpy as np
 from datetime import datetime
 
-from simulation import setup_simulation
-from visualization import Renderer, UIController
+from simulation import create_simulation, run_headless, run_sharded, replicate, run_sweep, parse_sweep_args, open_trace, make_config, save_checkpoint, sync_route_stats
+
+# pygame e matplotlib só são importados quando a janela ou os gráficos são usados
+_IMPORTED = time.perf_counter()
+
 
-# Usar backend que não requer interface gráfica durante a simulação
-matplotlib.use('Agg')
+class StartupProfile:
+    """Tempo de cada fase da inicialização até o primeiro quadro (--profile-startup)"""
+    
+    def __init__(self, start):
+        self.last = start
+        self.start = start
+        self.phases = []
+    
+    def mark(self, phase, at=None):
+        """Atribui a `phase` o tempo decorrido desde a marca anterior"""
+        now = time.perf_counter() if at is None else at
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def report(self):
+        total = self.last - self.start
+        print("\n=== Inicialização até o primeiro quadro ===")
+        for phase, seconds in self.phases:
+            print(f"{phase:<34} {seconds * 1000:8.1f} ms {seconds / total * 100:5.1f}%")
+        print(f"{'total':<34} {total * 1000:8.1f} ms")
 
 
 def generate_charts(metrics, couriers, all_orders, config):
     """Gera gráficos com os dados da simulação"""
+    import matplotlib
+    # Usar backend que não requer interface gráfica
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     # Configurar estilo
@@ -91,14 +119,18 @@ def generate_charts(metrics, couriers, all_orders, config):
         ax3.text(bar.get_x() + bar.get_width()/2., height,
                 f'{int(height)}', ha='center', va='bottom', fontsize=10, fontweight='bold')
     
-    # 4. Histograma - Distribuição de Tempos de Entrega
+    # 4. Histograma - Distribuição de Tempos de Entrega (a partir do histograma em streaming)
     ax4 = plt.subplot(2, 3, 4)
-    delivery_times = [o.delivery_time for o in all_orders if o.completed]
-    
-    if delivery_times:
-        ax4.hist(delivery_times, bins=20, color='#32FF96', edgecolor='white', linewidth=1.2, alpha=0.8)
-        ax4.axvline(sum(delivery_times)/len(delivery_times), color='#FF466E', 
-                   linestyle='--', linewidth=2, label=f'Média: {sum(delivery_times)/len(delivery_times):.1f}s')
+    latency = metrics['delivery_latency']
+    
+    if latency.count:
+        edges, counts = latency.bins()
+        ax4.hist(edges[:-1], bins=20, weights=counts, color='#32FF96', edgecolor='white', linewidth=1.2, alpha=0.8)
+        ax4.axvline(latency.mean, color='#FF466E', 
+                   linestyle='--', linewidth=2, label=f'Média: {latency.mean:.1f}s')
+        p50, p95, p99 = latency.quantiles((0.5, 0.95, 0.99))
+        ax4.axvline(p95, color='#FFDC64', linestyle=':', linewidth=2, label=f'p95: {p95:.1f}s')
+        ax4.axvline(p99, color='#FF8C50', linestyle=':', linewidth=2, label=f'p99: {p99:.1f}s')
         ax4.set_xlabel('Tempo de Entrega (segundos)', fontweight='bold')
         ax4.set_ylabel('Frequência', fontweight='bold')
         ax4.set_title('Distribuição dos Tempos de Entrega', fontsize=12, fontweight='bold', pad=15)
@@ -108,36 +140,32 @@ def generate_charts(metrics, couriers, all_orders, config):
     # 5. Linha do Tempo - Pedidos ao Longo do Tempo
     ax5 = plt.subplot(2, 3, 5)
     
-    # Criar timeline de eventos
+    # Timeline a partir da série em baldes gravada durante a execução
+    timeline = metrics['timeline']
     time_intervals = 20
     interval_size = config.SIM_TIME / time_intervals
-    completed_per_interval = [0] * time_intervals
-    created_per_interval = [0] * time_intervals
-    desisted_per_interval = [0] * time_intervals
-    
-    for order in all_orders:
-        created_idx = min(int(order.created / interval_size), time_intervals - 1)
-        created_per_interval[created_idx] += 1
-        
-        if order.completed:
-            completed_idx = min(int(order.completed / interval_size), time_intervals - 1)
-            completed_per_interval[completed_idx] += 1
-    
-    # Estimar desistências (distribuição baseada no total)
-    total_desisted = metrics['desisted']
-    if total_desisted > 0:
-        for i in range(time_intervals):
-            desisted_per_interval[i] = int(total_desisted / time_intervals)
+    per_interval = timeline.rebin(time_intervals, config.SIM_TIME)
+    created_per_interval = per_interval['created']
+    completed_per_interval = per_interval['completed']
+    desisted_per_interval = per_interval['desisted']
     
     time_labels = [f'{int(i * interval_size)}' for i in range(time_intervals)]
+    positions = np.arange(time_intervals)
     
-    ax5.plot(time_labels, created_per_interval, marker='o', linewidth=2, 
+    ax5.plot(positions, created_per_interval, marker='o', linewidth=2, 
             label='Criados', color='#64B4FF', markersize=5)
-    ax5.plot(time_labels, completed_per_interval, marker='s', linewidth=2, 
+    ax5.plot(positions, completed_per_interval, marker='s', linewidth=2, 
             label='Completados', color='#32FF96', markersize=5)
-    ax5.plot(time_labels, desisted_per_interval, marker='^', linewidth=2, 
+    ax5.plot(positions, desisted_per_interval, marker='^', linewidth=2, 
             label='Desistências', color='#FF466E', markersize=5)
     
+    # Fila média de cada balde, na mesma escala de intervalos do eixo x
+    ax5_twin = ax5.twinx()
+    ax5_twin.plot(timeline.starts / interval_size, timeline.mean('queue'), linestyle='--', linewidth=1.2,
+                  color='#FFDC64', alpha=0.7, label='Fila média')
+    ax5_twin.set_ylabel('Fila', fontweight='bold', color='#FFDC64')
+    ax5_twin.tick_params(axis='y', labelcolor='#FFDC64')
+    
     ax5.set_xlabel('Tempo (segundos)', fontweight='bold')
     ax5.set_ylabel('Número de Pedidos', fontweight='bold')
     ax5.set_title('Linha do Tempo - Pedidos', fontsize=12, fontweight='bold', pad=15)
@@ -197,23 +225,41 @@ def generate_charts(metrics, couriers, all_orders, config):
     plt.close()
 
 
-def main():
-    env, couriers, orders_queue, all_orders, metrics = setup_simulation(config)
+def run_gui(config, profile=None):
+    import pygame
+    from visualization import Renderer, UIController
+    if profile is not None:
+        profile.mark("imports (pygame, visualização)")
+    
+    trace = open_trace(config)
+    env, couriers, orders_queue, all_orders, metrics = create_simulation(config, trace)
+    if profile is not None:
+        profile.mark("simulação")
     
     renderer = Renderer(config)
-    renderer.initialize()
+    renderer.initialize(profile)
     
     ui = UIController()
+    profiler = renderer.profiler
     
     while ui.running:
         if not ui.process_events():
             break
         
+        profiler.hud = ui.show_profiler
+        profiler.begin_frame()
         if not ui.paused and env.now < config.SIM_TIME:
             env.run(until=env.now + config.FRAME_DT * ui.speed_mult)
+        profiler.lap('sim')
         
         renderer.draw(env, couriers, orders_queue, metrics, ui.paused, ui.speed_mult)
         ui.flip_display()
+        profiler.lap('flip')
+        profiler.end_frame(env.now)
+        if profile is not None:
+            profile.mark("primeiro quadro")
+            profile.report()
+            break
         ui.tick(config.FPS) 
         
         if env.now >= config.SIM_TIME:
@@ -222,7 +268,51 @@ def main():
                 break
     
     renderer.cleanup()
+    if trace is not None:
+        trace.close()
+    sync_route_stats(env.context)
     
+    return env, couriers, orders_queue, all_orders, metrics
+
+
+def run_replay(config, path):
+    """Reproduz um trace gravado no Renderer, sem SimPy"""
+    from visualization import Renderer, ReplayController, TraceReplay
+    
+    replay = TraceReplay(path)
+    config = make_config(config, MAP_SIZE=tuple(replay.meta['map_size']), SIM_TIME=replay.end_time)
+    
+    renderer = Renderer(config)
+    renderer.initialize()
+    
+    ui = ReplayController()
+    profiler = renderer.profiler
+    t = replay.start_time
+    
+    while ui.running:
+        if not ui.process_events():
+            break
+        
+        profiler.hud = ui.show_profiler
+        profiler.begin_frame()
+        t += ui.take_seek()
+        if not ui.paused:
+            t += config.FRAME_DT * ui.speed_mult * ui.direction
+        t = min(max(t, replay.start_time), replay.end_time)
+        replay.seek(t)
+        profiler.lap('sim')
+        
+        renderer.draw(replay.clock, replay.couriers, replay.queue, replay.metrics,
+                      ui.paused, ui.speed_mult * ui.direction)
+        ui.flip_display()
+        profiler.lap('flip')
+        profiler.end_frame(t)
+        ui.tick(config.FPS)
+    
+    renderer.cleanup()
+
+
+def print_final_stats(metrics, couriers, orders_queue):
     in_progress = 0
     for c in couriers:
         if c.current_order and not c.current_order.completed:
@@ -246,18 +336,162 @@ def main():
     
     avg_delivery = metrics.get('total_delivery_time', 0) / max(1, metrics['completed'])
     print(f"Tempo médio de entrega: {round(avg_delivery, 1)}s")
+    print_latency_stats(metrics)
+    
+    if 'routed_dispatches' in metrics:
+        lookups = metrics['route_cache_hits'] + metrics['route_cache_misses']
+        hit_rate = metrics['route_cache_hits'] / max(1, lookups)
+        per_dispatch = metrics['routing_time'] / max(1, metrics['routed_dispatches']) * 1000
+        print(f"Cache de rotas: {round(hit_rate * 100, 1)}% de acertos")
+        print(f"Roteamento por despacho: {round(per_dispatch, 3)}ms")
     
     print("\n=== Estatísticas por Entregador ===")
     for c in couriers:
         print(f"{c.name}: {c.total_deliveries} entregas, "
               f"{round(c.utilization * 100, 1)}% utilização")
+
+
+LATENCY_LABELS = [
+    ('delivery_latency', "Entrega (criação → entrega)"),
+    ('wait_latency', "Espera (criação → atribuição)"),
+    ('transit_latency', "Trajeto (coleta → entrega)"),
+]
+
+
+def print_latency_stats(latencies):
+    print("\n=== Latências p50 / p95 / p99 (s) ===")
+    for key, label in LATENCY_LABELS:
+        if key in latencies:
+            p50, p95, p99 = latencies[key].quantiles((0.5, 0.95, 0.99))
+            print(f"{label}: {round(p50, 1)} / {round(p95, 1)} / {round(p99, 1)}")
+
+
+def print_replication_stats(summary):
+    labels = [
+        ('success_rate', "Taxa de sucesso (%)"),
+        ('mean_delivery_time', "Tempo médio de entrega (s)"),
+        ('p50_delivery_time', "Tempo de entrega p50 (s)"),
+        ('p95_delivery_time', "Tempo de entrega p95 (s)"),
+        ('p99_delivery_time', "Tempo de entrega p99 (s)"),
+        ('accidents', "Acidentes"),
+        ('total_orders', "Total de pedidos"),
+        ('completed', "Completados"),
+        ('desisted', "Desistências"),
+    ]
+    
+    print(f"\n=== Replicações ({summary['replications']}) - média ± IC 95% ===")
+    for key, label in labels:
+        mean, half = summary[key]
+        print(f"{label}: {round(mean, 2)} ± {round(half, 2)}")
+    
+    print("\n=== Utilização por Entregador (%) ===")
+    for name, (mean, half) in zip(summary['couriers'], summary['utilization']):
+        print(f"{name}: {round(mean, 1)} ± {round(half, 1)}")
+    
+    # Percentis sobre todas as entregas das replicações (histogramas somados)
+    print_latency_stats(summary['pooled_latency'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Flash Move - Simulação de Delivery")
+    parser.add_argument('--headless', action='store_true',
+                        help="executa a simulação completa sem janela pygame")
+    parser.add_argument('--charts', action='store_true',
+                        help="no modo headless, gera também o relatório de gráficos")
+    parser.add_argument('--replicate', type=int, metavar='N',
+                        help="executa N replicações independentes em paralelo e mostra intervalos de confiança")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="número de processos para --replicate/--sweep (padrão: todos os núcleos)")
+    parser.add_argument('--sweep', action='append', metavar='PARAM=VALORES',
+                        help="varre um parâmetro do config, ex.: NUM_COURIERS=2,4,8 ou SERVICE_SPEED=60:100:20 "
+                             "(pode repetir; --replicate define replicações por combinação)")
+    parser.add_argument('--output', default='sweep_results.csv',
+                        help="arquivo CSV de resultados da varredura (retomável)")
+    parser.add_argument('--replay', metavar='ARQUIVO',
+                        help="reproduz um trace gravado com --trace (R inverte, ←/→ e PgUp/PgDn saltam no tempo)")
+    parser.add_argument('--checkpoint', metavar='ARQUIVO',
+                        help="simula sem display até --checkpoint-at e salva o estado completo")
+    parser.add_argument('--checkpoint-at', type=float, metavar='SEGUNDOS',
+                        help="instante do checkpoint (usado com --checkpoint)")
+    parser.add_argument('--resume', metavar='ARQUIVO',
+                        help="continua a partir de um checkpoint (vale para GUI, --headless, --replicate e --sweep)")
+    parser.add_argument('--shards', type=int, metavar='N',
+                        help="no modo headless, divide o mapa em N regiões simuladas em processos paralelos")
+    parser.add_argument('--trace', metavar='ARQUIVO',
+                        help="grava o trace de eventos em .npz (aceita campos do config, ex.: trace_{SEED}.npz)")
+    parser.add_argument('--profile-frames', metavar='ARQUIVO',
+                        help="grava em CSV o tempo de cada fase de cada quadro (simulação e etapas do desenho)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="abre a janela, mede cada fase até o primeiro quadro e encerra")
+    args = parser.parse_args(argv)
+    if args.checkpoint and args.checkpoint_at is None:
+        parser.error("--checkpoint requer --checkpoint-at")
+    if args.shards and not args.headless:
+        parser.error("--shards requer --headless")
+    if args.profile_startup and args.headless:
+        parser.error("--profile-startup mede a abertura da janela e não combina com --headless")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        config.TRACE_PATH = args.trace
+    if args.profile_frames:
+        config.FRAME_PROFILE_PATH = args.profile_frames
+    if args.resume:
+        config.RESUME_FROM = args.resume
+    
+    if args.replay:
+        run_replay(config, args.replay)
+        sys.exit(0)
+    
+    if args.profile_startup:
+        profile = StartupProfile(_START)
+        profile.mark("imports (config, simulação)", _IMPORTED)
+        profile.mark("argumentos")
+        run_gui(config, profile)
+        sys.exit(0)
+    
+    if args.checkpoint:
+        env, couriers, orders_queue, all_orders, metrics = create_simulation(config)
+        env.run(until=args.checkpoint_at)
+        save_checkpoint(env, args.checkpoint)
+        print(f"\n💾 Checkpoint salvo em: {args.checkpoint} (t={round(env.now, 1)}s)")
+        sys.exit(0)
+    
+    if args.sweep:
+        ranges = parse_sweep_args(args.sweep, config)
+        run_sweep(config, ranges, args.output, args.replicate or 1, args.workers)
+        print(f"\n📄 Resultados salvos em: {args.output}")
+        sys.exit(0)
+    
+    if args.replicate:
+        summary, _ = replicate(config, args.replicate, args.workers)
+        print_replication_stats(summary)
+        sys.exit(0)
+    
+    if args.shards:
+        config.SHARDS = args.shards
+    
+    if args.headless and config.SHARDS > 1:
+        env, couriers, orders_queue, all_orders, metrics = run_sharded(config)
+        print(f"\n🗺️  {env.shards} regiões ({env.grid[0]}×{env.grid[1]}), {env.barriers} barreiras de {env.window}s, "
+              f"{env.courier_handovers} repasses de entregadores, {env.order_handovers} de pedidos")
+    elif args.headless:
+        env, couriers, orders_queue, all_orders, metrics = run_headless(config)
+    else:
+        env, couriers, orders_queue, all_orders, metrics = run_gui(config)
+    
+    print_final_stats(metrics, couriers, orders_queue)
     
     # Gerar gráficos
-    print("\n📊 Gerando gráficos...")
-    generate_charts(metrics, couriers, all_orders, config)
+    if not args.headless or args.charts:
+        print("\n📊 Gerando gráficos...")
+        generate_charts(metrics, couriers, all_orders, config)
     
     sys.exit(0)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
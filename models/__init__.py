@@ -1,4 +1,4 @@
-from .order import Order
+from .order import Order, OrderTable
 from .courier import Courier
 
-__all__ = ['Order', 'Courier']
+__all__ = ['Order', 'OrderTable', 'Courier']
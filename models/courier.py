@@ -1,70 +1,341 @@
 import numpy as np
 import random
 from collections import deque
+from simpy import Interrupt
 
 class Courier:
+    __slots__ = (
+        'env', 'id', 'name', '_pos', '_leg', '_legs', 'status', 'current_order',
+        'assigned_event', 'total_busy_time', 'total_deliveries', '_trail',
+        'service_speed', 'metrics', 'config', 'dispatch_signal', 'on_complete',
+        'spatial_index', 'had_accident', 'movement_mode', 'trace', '_run_proc',
+        'phase', 'wake', 'route', 'waypoints', 'travelled', 'segment', 'roads',
+    )
     
-    def __init__(self, env, cid, start_pos=(0, 0), service_speed=80.0, name=None, metrics=None, config=None):
+    def __init__(self, env, cid, start_pos=(0, 0), service_speed=80.0, name=None, metrics=None, config=None, dispatch_signal=None, on_complete=None, spatial_index=None, trace=None, roads=None, autostart=True):
         self.env = env
         self.id = cid
         self.name = name if name else f"Courier {cid}"
-        self.pos = np.array(start_pos, dtype=float)
+        self._pos = np.array(start_pos, dtype=float)
+        self._leg = None
+        self._legs = deque(maxlen=20)
         self.status = "idle"
         self.current_order = None
         self.assigned_event = None
         self.total_busy_time = 0.0
         self.total_deliveries = 0
-        self.trail = deque(maxlen=20)
+        self._trail = deque(maxlen=20)
         self.service_speed = service_speed
         self.metrics = metrics
         self.config = config
+        self.dispatch_signal = dispatch_signal
+        self.on_complete = on_complete
+        self.spatial_index = spatial_index
         self.had_accident = False
-        self._run_proc = env.process(self.process())
+        self.movement_mode = getattr(config, 'MOVEMENT_MODE', 'stepped')
+        self.trace = trace
+        self.phase = None
+        self.wake = None
+        self.route = None
+        self.waypoints = []
+        self.roads = roads
+        self.travelled = 0.0
+        self.segment = None
+        self._run_proc = None
+        if autostart:
+            self.start()
+
+    @property
+    def pos(self):
+        if self._leg is None:
+            return self._pos
+        return self._position_on_leg(self._leg, self.env.now)
+
+    @pos.setter
+    def pos(self, value):
+        self._pos = np.array(value, dtype=float)
+        self._leg = None
+
+    @property
+    def trail(self):
+        if self.movement_mode == "stepped":
+            return self._trail
+        return self._sample_trail()
 
     def assign(self, order):
-        if self.assigned_event is None or self.assigned_event.triggered:
+        if self.assigned_event is None:
             self.assigned_event = self.env.event()
+        # Marca como ocupado já na atribuição para não receber outro pedido no mesmo instante
+        self.status = "to_pickup"
+        if self.spatial_index is not None:
+            self.spatial_index.discard(self)
         self.assigned_event.succeed(value=order)
 
+    def snapshot(self):
+        """Estado explícito do entregador, sem o processo SimPy, usado por checkpoints"""
+        if self.movement_mode == "stepped":
+            raise ValueError("Checkpoint requer MOVEMENT_MODE = 'analytic'")
+        pending = None
+        if self.assigned_event is not None and self.assigned_event.triggered:
+            pending = self.assigned_event.value.id
+        return {
+            'id': self.id,
+            'name': self.name,
+            'service_speed': self.service_speed,
+            'pos': self._pos.copy(),
+            'leg': self._leg,
+            'legs': list(self._legs),
+            'status': self.status,
+            'current_order': self.current_order.id if self.current_order is not None else None,
+            'pending_order': pending,
+            'total_busy_time': self.total_busy_time,
+            'total_deliveries': self.total_deliveries,
+            'had_accident': self.had_accident,
+            'phase': self.phase,
+            'wake': self.wake,
+            'route': self.route,
+            'waypoints': list(self.waypoints),
+            'travelled': self.travelled,
+            'segment': self.segment,
+        }
+
+    def restore(self, state, all_orders):
+        """Recarrega um snapshot; o processo deve ser iniciado depois com start()"""
+        self._pos = state['pos'].copy()
+        self._leg = state['leg']
+        self._legs.extend(state['legs'])
+        self.status = state['status']
+        self.current_order = None if state['current_order'] is None else all_orders[state['current_order']]
+        if state['pending_order'] is not None:
+            # Pedido atribuído durante a pausa pós-entrega, ainda não consumido pelo processo
+            self.assigned_event = self.env.event()
+            self.assigned_event.succeed(value=all_orders[state['pending_order']])
+        self.total_busy_time = state['total_busy_time']
+        self.total_deliveries = state['total_deliveries']
+        self.had_accident = state['had_accident']
+        self.phase = state['phase']
+        self.wake = state['wake']
+        self.route = state['route']
+        self.waypoints = list(state['waypoints'])
+        self.travelled = state['travelled']
+        self.segment = state['segment']
+
+    def detach(self):
+        """Encerra o processo neste ambiente, para o entregador continuar em outro a partir do snapshot.
+        
+        A interrupção é entregue antes de qualquer outro evento quando o ambiente voltar a
+        rodar, e o processo termina sem alterar o estado.
+        """
+        if self.spatial_index is not None:
+            self.spatial_index.discard(self)
+        proc = self._run_proc
+        if proc is not None and proc.is_alive:
+            proc.interrupt("detach")
+
     def distance_to(self, point):
+        if self.roads is not None:
+            return float(self.roads.distance_matrix([point], [self.pos])[0, 0])
         return np.linalg.norm(self.pos - np.array(point, dtype=float))
 
+    def start(self):
+        if self.movement_mode == "stepped":
+            self._run_proc = self.env.process(self._process_stepped())
+        else:
+            self._run_proc = self.env.process(self.process())
+        return self._run_proc
+
     def process(self):
-        while True:
-            self.status = "idle"
-            self.current_order = None
-            self.assigned_event = self.env.event()
-            order = yield self.assigned_event
-            
-            self.current_order = order
-            order.assigned = self.env.now
-            
-            self.status = "to_pickup"
-            start = self.pos.copy()
-            end = np.array(order.pickup, dtype=float)
-            travel_time = max(1e-6, np.linalg.norm(end - start) / self.service_speed)
-            yield from self._move(start, end, travel_time)
+        # Máquina de estados explícita: todo o progresso fica em atributos (fase, trecho e
+        # instante de despertar), então o processo pode ser recriado a partir de um checkpoint
+        if self.phase is None:
+            self._set_idle()
+            self.phase = "idle"
+        try:
+            while True:
+                if self.phase == "idle":
+                    if self.assigned_event is None:
+                        self.assigned_event = self.env.event()
+                    order = yield self.assigned_event
+                    self.assigned_event = None
+                    self._begin_delivery(order)
+                else:
+                    yield self.env.timeout_at(self.wake)
+                    self._advance()
+        except Interrupt:
+            # detach(): o entregador seguiu para outro ambiente
+            return
+
+    def _begin_delivery(self, order):
+        self.current_order = order
+        order.assigned = self.env.now
+        if self.trace is not None:
+            self.trace.order_event(self.env.now, 'assigned', order, self.id)
+        self.status = "to_pickup"
+        self._begin_leg(order.pickup)
+
+    def _begin_leg(self, target):
+        # Em linha reta o percurso é um único trecho; com rede viária segue a polilinha do caminho mínimo
+        if self.roads is None:
+            self.waypoints = [(np.array(target, dtype=float), 1.0)]
+        else:
+            self.waypoints = self.roads.route(self.pos, target)
+        self._begin_piece()
+
+    def _begin_piece(self):
+        end, factor = self.waypoints.pop(0)
+        start = self.pos.copy()
+        travel_time = max(1e-6, np.linalg.norm(end - start) / (self.service_speed / factor))
+        self.route = (start, end, travel_time)
+        self.travelled = 0.0
+        self._begin_segment()
+
+    def _begin_segment(self):
+        # Um único evento por trecho; a posição é interpolada sob demanda
+        start, end, total_time = self.route
+        if total_time - self.travelled <= 1e-9:
+            self._finish_leg()
+            return
+        
+        leg_time = total_time - self.travelled
+        accident_after = self._draw_accident_offset(leg_time)
+        seg_time = leg_time if accident_after is None else accident_after
+        
+        dist_vec = end - start
+        seg_start = start + dist_vec * (self.travelled / total_time)
+        seg_end = start + dist_vec * min(1.0, (self.travelled + seg_time) / total_time)
+        if self.trace is not None:
+            # Cada trecho vira um waypoint; o replay interpola entre eles
+            self.trace.courier_state(self.env.now, self, self.status, seg_start)
+        self._leg = (seg_start, seg_end, self.env.now, self.env.now + seg_time)
+        self._legs.append(self._leg)
+        
+        self.segment = (seg_end, seg_time, accident_after is not None)
+        self.phase = "travel"
+        self.wake = self.env.now + seg_time
+
+    def _advance(self):
+        if self.phase == "travel":
+            seg_end, seg_time, crashed = self.segment
+            self.pos = seg_end
+            self.travelled += seg_time
+            self.segment = None
+            if crashed:
+                self._begin_accident()
+            else:
+                self._begin_segment()
+        elif self.phase == "accident":
+            self.had_accident = False
+            self._begin_segment()
+        elif self.phase == "cooldown":
+            self.phase = "idle"
+            self.wake = None
+
+    def _finish_leg(self):
+        self.pos = self.route[1].copy()
+        self.route = None
+        if self.waypoints:
+            self._begin_piece()
+            return
+        order = self.current_order
+        
+        if self.status == "to_pickup":
             order.picked = self.env.now
-            
+            if self.trace is not None:
+                self.trace.order_event(self.env.now, 'picked', order, self.id)
             self.status = "to_dropoff"
+            self._begin_leg(order.dropoff)
+            return
+        
+        order.completed = self.env.now
+        if self.trace is not None:
+            self.trace.order_event(self.env.now, 'completed', order, self.id)
+        if self.on_complete is not None:
+            self.on_complete(order)
+        
+        self.total_busy_time += (self.env.now - order.assigned)
+        self.total_deliveries += 1
+        
+        self._set_idle()
+        self.phase = "cooldown"
+        self.wake = self.env.now + 0.1
+
+    def _begin_accident(self):
+        self.had_accident = True
+        self.metrics['accidents'] += 1
+        self.metrics['timeline'].record('accidents', self.env.now)
+        if self.trace is not None:
+            self.trace.courier_state(self.env.now, self, "accident", self._pos)
+        if self.config.VERBOSE:
+            self._print_accident()
+        self.phase = "accident"
+        self.wake = self.env.now + 30
+
+    def _process_stepped(self):
+        self._set_idle()
+        try:
+            while True:
+                if self.assigned_event is None:
+                    self.assigned_event = self.env.event()
+                order = yield self.assigned_event
+                self.assigned_event = None
+                
+                self.current_order = order
+                order.assigned = self.env.now
+                if self.trace is not None:
+                    self.trace.order_event(self.env.now, 'assigned', order, self.id)
+                
+                self.status = "to_pickup"
+                yield from self._travel_stepped(order.pickup)
+                order.picked = self.env.now
+                if self.trace is not None:
+                    self.trace.order_event(self.env.now, 'picked', order, self.id)
+                
+                self.status = "to_dropoff"
+                yield from self._travel_stepped(order.dropoff)
+                order.completed = self.env.now
+                if self.trace is not None:
+                    self.trace.order_event(self.env.now, 'completed', order, self.id)
+                if self.on_complete is not None:
+                    self.on_complete(order)
+                
+                self.total_busy_time += (self.env.now - order.assigned)
+                self.total_deliveries += 1
+                
+                self._set_idle()
+                
+                yield self.env.timeout(0.1)
+        except Interrupt:
+            # detach(): o entregador seguiu para outro ambiente
+            return
+
+    def _set_idle(self):
+        self.status = "idle"
+        self.current_order = None
+        if self.trace is not None:
+            self.trace.courier_state(self.env.now, self, "idle", self._pos)
+        if self.spatial_index is not None:
+            self.spatial_index.insert(self, self.pos)
+        if self.dispatch_signal is not None:
+            self.dispatch_signal.notify()
+
+    def _travel_stepped(self, target):
+        if self.roads is None:
+            pieces = [(np.array(target, dtype=float), 1.0)]
+        else:
+            pieces = self.roads.route(self.pos, target)
+        for end, factor in pieces:
             start = self.pos.copy()
-            end = np.array(order.dropoff, dtype=float)
-            travel_time = max(1e-6, np.linalg.norm(end - start) / self.service_speed)
-            yield from self._move(start, end, travel_time)
-            order.completed = self.env.now
-            
-            self.total_busy_time += (self.env.now - order.assigned)
-            self.total_deliveries += 1
-            
-            self.status = "idle"
-            self.current_order = None
-            
-            yield self.env.timeout(0.1)
+            travel_time = max(1e-6, np.linalg.norm(end - start) / (self.service_speed / factor))
+            yield from self._move_stepped(start, end, travel_time)
 
-    def _move(self, start, end, total_time, step=0.2):
+    def _move_stepped(self, start, end, total_time, step=0.2):
         dist_vec = end - start
         remaining = total_time
         t0 = self.env.now
+        travelled = 0.0
+        accident_at = self._draw_accident_offset(total_time)
+        if self.trace is not None:
+            self.trace.courier_state(self.env.now, self, self.status, self._pos)
         
         while remaining > 1e-9:
             dt = min(step, remaining)
@@ -73,23 +344,67 @@ class Courier:
             frac = dt / total_time if total_time > 0 else 1.0
             
             self.pos = start + dist_vec * min(1.0, done_frac + frac)
-            self.trail.append(tuple(self.pos))
+            self._trail.append(tuple(self.pos))
             
-            if self.config and self.metrics and not self.had_accident:
-                accident_prob = self.config.ACCIDENT_PROBABILITY * dt
-                if random.random() < accident_prob:
-                    self.had_accident = True
-                    self.metrics['accidents'] += 1
-                    print(f"\n🚨 ACIDENTE! {self.name} sofreu um acidente durante a entrega do pedido #{self.current_order.id if self.current_order else '?'}")
-                    print(f"   Posição: ({int(self.pos[0])}, {int(self.pos[1])}) - Tempo: {round(self.env.now, 1)}s\n")
-                    yield self.env.timeout(30)
-                    self.had_accident = False
+            if accident_at is not None and accident_at < travelled + dt:
+                t_accident = self.env.now
+                yield from self._accident()
+                t0 += self.env.now - t_accident
+                next_offset = self._draw_accident_offset(remaining - dt)
+                accident_at = None if next_offset is None else travelled + dt + next_offset
+                if self.trace is not None:
+                    self.trace.courier_state(self.env.now, self, self.status, self._pos)
             
             yield self.env.timeout(dt)
             remaining -= dt
+            travelled += dt
         
         self.pos = end.copy()
-        self.trail.append(tuple(self.pos))
+        self._trail.append(tuple(self.pos))
+
+    def _draw_accident_offset(self, leg_time):
+        # Tempo até o acidente ~ Exp(ACCIDENT_PROBABILITY), sorteado uma vez por trecho.
+        # Sem memória: depois de uma pausa basta sortear de novo para o restante do trecho.
+        if not (self.config and self.metrics) or self.config.ACCIDENT_PROBABILITY <= 0:
+            return None
+        offset = random.expovariate(self.config.ACCIDENT_PROBABILITY)
+        return offset if offset < leg_time else None
+
+    def _accident(self):
+        self.had_accident = True
+        self.metrics['accidents'] += 1
+        self.metrics['timeline'].record('accidents', self.env.now)
+        if self.trace is not None:
+            self.trace.courier_state(self.env.now, self, "accident", self._pos)
+        if self.config.VERBOSE:
+            self._print_accident()
+        yield self.env.timeout(30)
+        self.had_accident = False
+
+    def _print_accident(self):
+        print(f"\n🚨 ACIDENTE! {self.name} sofreu um acidente durante a entrega do pedido #{self.current_order.id if self.current_order else '?'}")
+        print(f"   Posição: ({int(self.pos[0])}, {int(self.pos[1])}) - Tempo: {round(self.env.now, 1)}s\n")
+
+    def _position_on_leg(self, leg, t):
+        start, end, t0, t1 = leg
+        if t1 <= t0:
+            return end.copy()
+        frac = min(1.0, max(0.0, (t - t0) / (t1 - t0)))
+        return start + (end - start) * frac
+
+    def _sample_trail(self, step=0.2):
+        # Reconstrói os últimos pontos percorridos a partir dos trechos recentes
+        points = []
+        now = self.env.now
+        for leg in reversed(self._legs):
+            t = min(leg[3], now)
+            while t >= leg[2] and len(points) < self._trail.maxlen:
+                points.append(tuple(self._position_on_leg(leg, t)))
+                t -= step
+            if len(points) >= self._trail.maxlen:
+                break
+        points.reverse()
+        return points
     
     @property
     def utilization(self):
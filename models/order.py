@@ -1,18 +1,145 @@
-import random
 import numpy as np
+
+
+class OrderTable:
+    """Armazena todos os pedidos em colunas NumPy; cada pedido é acessado por um handle leve"""
+    
+    COLUMNS = (
+        'created', 'assigned', 'picked', 'completed',
+        'pickup_x', 'pickup_y', 'dropoff_x', 'dropoff_y',
+        'base_priority',
+    )
+    
+    def __init__(self, capacity=1024, priority_block=1024):
+        self._size = 0
+        self._columns = {name: np.full(capacity, np.nan) for name in self.COLUMNS}
+        self._priority_block = priority_block
+        self._priority_pool = np.empty(0)
+        self._priority_next = 0
+    
+    def create(self, pickup, dropoff, created_time, base_priority=None):
+        if self._size == len(self._columns['created']):
+            self._grow()
+        
+        i = self._size
+        self._size += 1
+        cols = self._columns
+        cols['created'][i] = created_time
+        cols['pickup_x'][i], cols['pickup_y'][i] = pickup
+        cols['dropoff_x'][i], cols['dropoff_y'][i] = dropoff
+        cols['base_priority'][i] = self._draw_priority() if base_priority is None else base_priority
+        return Order(self, i)
+    
+    def column(self, name):
+        return self._columns[name][:self._size]
+    
+    def completed_mask(self):
+        return ~np.isnan(self.column('completed'))
+    
+    def delivery_times(self):
+        mask = self.completed_mask()
+        return self.column('completed')[mask] - self.column('created')[mask]
+    
+    def snapshot(self):
+        """Estado completo da tabela (colunas e RNG de prioridades), usado por checkpoints"""
+        return {
+            'columns': {name: self.column(name).copy() for name in self.COLUMNS},
+            'priority_block': self._priority_block,
+            'priority_pool': self._priority_pool.copy(),
+            'priority_next': self._priority_next,
+        }
+    
+    @classmethod
+    def from_snapshot(cls, state):
+        size = len(state['columns']['created'])
+        table = cls(capacity=max(1024, size), priority_block=state['priority_block'])
+        for name, values in state['columns'].items():
+            table._columns[name][:size] = values
+        table._size = size
+        table._priority_pool = state['priority_pool'].copy()
+        table._priority_next = state['priority_next']
+        return table
+    
+    def _grow(self):
+        for name, col in self._columns.items():
+            grown = np.full(len(col) * 2, np.nan)
+            grown[:len(col)] = col
+            self._columns[name] = grown
+    
+    def _draw_priority(self):
+        # Sorteia prioridades em blocos em vez de uma chamada ao RNG por pedido
+        if self._priority_next >= len(self._priority_pool):
+            self._priority_pool = np.clip(np.random.normal(2.0, 0.8, self._priority_block), 0.5, 3.5)
+            self._priority_next = 0
+        value = self._priority_pool[self._priority_next]
+        self._priority_next += 1
+        return value
+    
+    def __getitem__(self, i):
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        return Order(self, i)
+    
+    def __iter__(self):
+        for i in range(self._size):
+            yield Order(self, i)
+    
+    def __len__(self):
+        return self._size
+
+
+def _optional(value):
+    return None if np.isnan(value) else float(value)
+
+
 class Order:
-    newid = 0
+    __slots__ = ('table', 'id')
+    
+    def __init__(self, table, index):
+        self.table = table
+        self.id = index
+    
+    @property
+    def pickup(self):
+        cols = self.table._columns
+        return (float(cols['pickup_x'][self.id]), float(cols['pickup_y'][self.id]))
     
-    def __init__(self, env, pickup, dropoff, created_time):
-        self.id = Order.newid
-        Order.newid += 1
-        self.pickup = pickup
-        self.dropoff = dropoff
-        self.created = created_time
-        self.assigned = None
-        self.picked = None
-        self.completed = None
-        self.base_priority = np.clip(np.random.normal(2.0, 0.8), 0.5, 3.5)
+    @property
+    def dropoff(self):
+        cols = self.table._columns
+        return (float(cols['dropoff_x'][self.id]), float(cols['dropoff_y'][self.id]))
+    
+    @property
+    def created(self):
+        return float(self.table._columns['created'][self.id])
+    
+    @property
+    def base_priority(self):
+        return float(self.table._columns['base_priority'][self.id])
+    
+    @property
+    def assigned(self):
+        return _optional(self.table._columns['assigned'][self.id])
+    
+    @assigned.setter
+    def assigned(self, value):
+        self.table._columns['assigned'][self.id] = np.nan if value is None else value
+    
+    @property
+    def picked(self):
+        return _optional(self.table._columns['picked'][self.id])
+    
+    @picked.setter
+    def picked(self, value):
+        self.table._columns['picked'][self.id] = np.nan if value is None else value
+    
+    @property
+    def completed(self):
+        return _optional(self.table._columns['completed'][self.id])
+    
+    @completed.setter
+    def completed(self, value):
+        self.table._columns['completed'][self.id] = np.nan if value is None else value
     
     @property
     def wait_time(self):
@@ -26,5 +153,11 @@ class Order:
             return self.completed - self.created
         return None
     
+    def __eq__(self, other):
+        return isinstance(other, Order) and other.table is self.table and other.id == self.id
+    
+    def __hash__(self):
+        return hash((id(self.table), self.id))
+    
     def __repr__(self):
         return f"Order(id={self.id}, pickup={self.pickup}, dropoff={self.dropoff})"
@@ -1,4 +1,16 @@
-from .processes import order_generator, dispatcher, monitor_completions
-from .environment import setup_simulation
+from .processes import order_generator, peak_monitor, dispatcher, abandonment_monitor, record_completion, sync_route_stats
+from .environment import SimEnvironment, setup_simulation, restore_simulation, create_simulation, run_headless
+from .checkpoint import save_checkpoint, load_checkpoint, snapshot_simulation
+from .signals import Signal
+from .order_queue import OrderQueue
+from .spatial import GridIndex
+from .roads import RoadNetwork
+from .replication import replicate, make_config
+from .sharding import run_sharded, shard_grid
+from .sweep import run_sweep, parse_sweep_args
+from .demand import sample_arrivals, ArrivalStream
+from .trace import TraceRecorder, open_trace, load_trace
+from .latency import LatencyHistogram
+from .timeseries import MetricSeries
 
-__all__ = ['order_generator', 'dispatcher', 'monitor_completions', 'setup_simulation']
+__all__ = ['order_generator', 'peak_monitor', 'dispatcher', 'abandonment_monitor', 'record_completion', 'sync_route_stats', 'SimEnvironment', 'setup_simulation', 'restore_simulation', 'create_simulation', 'run_headless', 'save_checkpoint', 'load_checkpoint', 'snapshot_simulation', 'Signal', 'OrderQueue', 'GridIndex', 'RoadNetwork', 'replicate', 'make_config', 'run_sharded', 'shard_grid', 'run_sweep', 'parse_sweep_args', 'sample_arrivals', 'ArrivalStream', 'TraceRecorder', 'open_trace', 'load_trace', 'LatencyHistogram', 'MetricSeries']
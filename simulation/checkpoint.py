@@ -0,0 +1,76 @@
+import copy
+import pickle
+import random
+import numpy as np
+from .processes import sync_route_stats
+
+
+CHECKPOINT_VERSION = 1
+
+
+def snapshot_simulation(env):
+    """Estado completo e serializável de uma simulação criada por setup_simulation.
+    
+    Só é válido entre passos do ambiente (após env.run(until=...)), quando todos os
+    eventos pendentes são timeouts dos processos da simulação.
+    """
+    ctx = env.context
+    config = ctx['config']
+    if env.now >= config.SIM_TIME:
+        raise ValueError("Checkpoint precisa ser tomado antes de SIM_TIME")
+    
+    queued = env.pending_events()
+    pending = {id(event): (t, eid) for t, eid, event in queued}
+    waiting = []
+    owned = 0
+    procs = [(name, proc) for name, proc in env.processes.items()]
+    procs += [(c.id, c._run_proc) for c in ctx['couriers']]
+    for name, proc in procs:
+        if not proc.is_alive:
+            continue
+        target = proc.target
+        if target.triggered:
+            if id(target) not in pending:
+                raise ValueError(f"Processo {name!r} não está em um ponto retomável")
+            t, eid = pending[id(target)]
+            waiting.append((eid, name, t))
+            owned += 1
+        else:
+            waiting.append((-1, name, None))
+    # Eventos sem callbacks (ex.: o marcador de parada deixado por env.run) não têm efeito
+    inert = sum(1 for _, _, event in queued if not event.callbacks)
+    if owned + inert != len(queued):
+        raise ValueError("Há eventos pendentes fora dos processos da simulação; avance com env.run(until=...)")
+    
+    # A ordem dos eventos pendentes (eid) decide empates no mesmo instante
+    waiting.sort(key=lambda item: item[0])
+    
+    sync_route_stats(ctx)
+    return {
+        'version': CHECKPOINT_VERSION,
+        'now': env.now,
+        'config': {name: getattr(config, name) for name in dir(config) if name.isupper()},
+        'random': random.getstate(),
+        'np_random': np.random.get_state(),
+        'metrics': copy.deepcopy(ctx['metrics']),
+        'all_orders': ctx['all_orders'].snapshot(),
+        'orders_queue': [o.id for o in ctx['orders_queue']],
+        'arrivals': ctx['arrivals'],
+        'couriers': [c.snapshot() for c in ctx['couriers']],
+        'processes': [(name, t) for _, name, t in waiting],
+    }
+
+
+def save_checkpoint(env, path):
+    state = snapshot_simulation(env)
+    with open(path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return state
+
+
+def load_checkpoint(path):
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Versão de checkpoint não suportada: {state.get('version')}")
+    return state
@@ -0,0 +1,96 @@
+import random
+import numpy as np
+
+
+class ArrivalStream:
+    """Chegadas pré-amostradas para todo o horizonte, reproduzidas pelo order_generator"""
+    
+    def __init__(self, times, pickups, dropoffs, priorities):
+        self.times = times
+        self.pickups = pickups
+        self.dropoffs = dropoffs
+        self.priorities = priorities
+    
+    def __len__(self):
+        return len(self.times)
+
+
+def sample_peak_window(config):
+    if not config.PEAK_ENABLED:
+        return None
+    peak_start = random.uniform(config.SIM_TIME * 0.3, config.SIM_TIME * 0.6)
+    return (peak_start, peak_start + config.PEAK_DURATION)
+
+
+def profile_multiplier(config, t):
+    """Multiplicador da taxa base no instante t (vetorizado), a partir de DEMAND_PROFILE"""
+    t = np.asarray(t, dtype=float)
+    if not config.DEMAND_PROFILE:
+        return np.ones_like(t)
+    
+    points = sorted(config.DEMAND_PROFILE)
+    xp = np.array([p[0] for p in points], dtype=float)
+    fp = np.array([p[1] for p in points], dtype=float)
+    if config.DEMAND_PROFILE_PERIOD:
+        t = np.mod(t, config.DEMAND_PROFILE_PERIOD)
+    return np.interp(t, xp, fp)
+
+
+def arrival_rate(config, t, peak_window=None):
+    """Taxa de chegada λ(t) em pedidos por segundo"""
+    rate = profile_multiplier(config, t) / config.INTERARRIVAL_MEAN
+    if peak_window is not None:
+        start, end = peak_window
+        rate = np.where((t >= start) & (t < end), rate * config.PEAK_MULTIPLIER, rate)
+    return rate
+
+
+def _max_rate(config, peak_window):
+    peak = config.PEAK_MULTIPLIER if peak_window is not None else 1.0
+    profile_max = max(p[1] for p in config.DEMAND_PROFILE) if config.DEMAND_PROFILE else 1.0
+    return profile_max * max(1.0, peak) / config.INTERARRIVAL_MEAN
+
+
+def sample_arrival_times(config, horizon, peak_window=None, chunk=4096):
+    # Thinning (Lewis-Shedler): processo homogêneo com λ_max, aceitando com prob. λ(t)/λ_max
+    lam_max = _max_rate(config, peak_window)
+    if lam_max <= 0:
+        return np.empty(0)
+    
+    accepted = []
+    t0 = 0.0
+    while t0 < horizon:
+        candidates = t0 + np.cumsum(np.random.exponential(1.0 / lam_max, chunk))
+        t0 = candidates[-1]
+        candidates = candidates[candidates < horizon]
+        keep = np.random.random(len(candidates)) * lam_max < arrival_rate(config, candidates, peak_window)
+        accepted.append(candidates[keep])
+    return np.concatenate(accepted)
+
+
+def sample_points(config, n, hotspots=None):
+    """Pontos no mapa: mistura de fundo uniforme e hotspots gaussianos (x, y, sigma, peso)"""
+    margin = 50
+    low = np.array([margin, margin], dtype=float)
+    high = np.array([config.MAP_SIZE[0] - margin, config.MAP_SIZE[1] - margin], dtype=float)
+    points = np.random.uniform(low, high, size=(n, 2))
+    
+    if hotspots and n:
+        weights = np.array([config.DEMAND_BACKGROUND_WEIGHT] + [h[3] for h in hotspots], dtype=float)
+        component = np.random.choice(len(weights), size=n, p=weights / weights.sum())
+        for k, (x, y, sigma, _) in enumerate(hotspots, start=1):
+            mask = component == k
+            if mask.any():
+                points[mask] = np.random.normal((x, y), sigma, size=(int(mask.sum()), 2))
+        points = np.clip(points, low, high)
+    
+    return points
+
+
+def sample_arrivals(config, horizon, peak_window=None):
+    times = sample_arrival_times(config, horizon, peak_window)
+    n = len(times)
+    pickups = sample_points(config, n, config.DEMAND_HOTSPOTS)
+    dropoffs = sample_points(config, n)
+    priorities = np.clip(np.random.normal(2.0, 0.8, n), 0.5, 3.5)
+    return ArrivalStream(times, pickups, dropoffs, priorities)
@@ -0,0 +1,106 @@
+import heapq
+import numpy as np
+
+
+WAIT_WEIGHT = 5.0
+PRIORITY_WEIGHT = 30.0
+
+
+def build_score_matrix(orders, couriers, now, roads=None):
+    """Matriz pedido x entregador com distância, espera e prioridade (menor é melhor)"""
+    pickups = np.array([o.pickup for o in orders], dtype=float).reshape(-1, 2)
+    positions = np.array([c.pos for c in couriers], dtype=float).reshape(-1, 2)
+    created = np.array([o.created for o in orders], dtype=float)
+    base_priority = np.array([getattr(o, 'base_priority', 2.0) for o in orders], dtype=float)
+    
+    if roads is None:
+        dist = np.linalg.norm(pickups[:, None, :] - positions[None, :, :], axis=2)
+    else:
+        dist = roads.distance_matrix(pickups, positions)
+    order_terms = (now - created) * WAIT_WEIGHT - (base_priority - 2.0) * PRIORITY_WEIGHT
+    return dist + order_terms[:, None]
+
+
+def order_score_terms(order, now):
+    base_priority = getattr(order, 'base_priority', 2.0)
+    return (now - order.created) * WAIT_WEIGHT - (base_priority - 2.0) * PRIORITY_WEIGHT
+
+
+def solve_greedy_indexed(orders, courier_index, now):
+    """Guloso exato usando o índice espacial dos entregadores livres.
+    
+    Espera e prioridade dependem só do pedido, então o melhor entregador de cada
+    pedido é sempre o livre mais próximo. Os entregadores escolhidos são removidos
+    do índice; pedidos cujo candidato foi tomado consultam o índice de novo.
+    """
+    heap = []
+    for row, order in enumerate(orders):
+        hit = courier_index.nearest(order.pickup)
+        if hit:
+            courier, dist = hit[0]
+            heap.append((dist + order_score_terms(order, now), row, courier))
+    heapq.heapify(heap)
+    
+    pairs = []
+    while heap and len(courier_index):
+        score, row, courier = heapq.heappop(heap)
+        if courier not in courier_index:
+            hit = courier_index.nearest(orders[row].pickup)
+            if hit:
+                courier, dist = hit[0]
+                heapq.heappush(heap, (dist + order_score_terms(orders[row], now), row, courier))
+            continue
+        courier_index.discard(courier)
+        pairs.append((row, courier))
+    
+    return pairs
+
+
+def solve_greedy(scores):
+    # Mesmo critério do laço original: escolhe sempre o par de menor score restante.
+    # Cada linha guarda sua melhor coluna; só as linhas que perderam a coluna são recalculadas.
+    scores = np.array(scores, dtype=float)
+    n_rows, n_cols = scores.shape
+    if n_rows == 0 or n_cols == 0:
+        return []
+    
+    best_col = np.argmin(scores, axis=1)
+    best = scores[np.arange(n_rows), best_col]
+    pairs = []
+    
+    for _ in range(min(n_rows, n_cols)):
+        row = int(np.argmin(best))
+        if not np.isfinite(best[row]):
+            break
+        col = int(best_col[row])
+        pairs.append((row, col))
+        
+        scores[row, :] = np.inf
+        scores[:, col] = np.inf
+        best[row] = np.inf
+        
+        stale = np.flatnonzero((best_col == col) & np.isfinite(best))
+        if stale.size:
+            best_col[stale] = np.argmin(scores[stale], axis=1)
+            best[stale] = scores[stale, best_col[stale]]
+    
+    return pairs
+
+
+def solve_hungarian(scores):
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError as e:
+        raise ImportError("DISPATCH_SOLVER = 'hungarian' requer o pacote scipy (pip install scipy)") from e
+    
+    scores = np.asarray(scores, dtype=float)
+    if scores.size == 0:
+        return []
+    rows, cols = linear_sum_assignment(scores)
+    return list(zip(rows.tolist(), cols.tolist()))
+
+
+SOLVERS = {
+    'greedy': solve_greedy,
+    'hungarian': solve_hungarian,
+}
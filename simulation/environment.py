@@ -1,19 +1,114 @@
+import copy
+import math
 import simpy
+import functools
 import random
 import numpy as np
-from collections import deque
-from models import Courier
-from .processes import order_generator, dispatcher, monitor_completions
+from models import Courier, OrderTable
+from .processes import order_generator, peak_monitor, dispatcher, abandonment_monitor, record_completion, sync_route_stats
+from .signals import Signal
+from .order_queue import OrderQueue
+from .spatial import GridIndex
+from .demand import sample_peak_window, sample_arrivals
+from .trace import open_trace
+from .roads import RoadNetwork
+from .latency import LatencyHistogram, LATENCY_METRICS
+from .timeseries import MetricSeries
+from .checkpoint import load_checkpoint
 
 
-def setup_simulation(config):
+class SimEnvironment(simpy.Environment):
+    """Ambiente SimPy com agendamento em tempo absoluto e referência aos componentes da simulação"""
+    
+    def __init__(self, initial_time=0):
+        super().__init__(initial_time)
+        self.context = {}
+        self.processes = {}
+    
+    def timeout_at(self, at, value=None):
+        # Agenda exatamente em `at`. O SimPy soma now + delay, e at - now pode perder 1 ulp
+        # na volta; o atraso é ajustado até a soma cair em `at`, como exige a retomada exata
+        now = self.now
+        delay = at - now
+        while now + delay < at:
+            delay = math.nextafter(delay, math.inf)
+        while now + delay > at:
+            delay = math.nextafter(delay, -math.inf)
+        return self.timeout(delay, value)
+    
+    # Único ponto que lê internos do SimPy (_queue, _eid): a API pública não expõe a fila de
+    # eventos pendentes. Versão fixada em requirements.txt (simpy>=4,<5)
+    def pending_events(self):
+        """Eventos agendados e ainda não processados, como [(instante, eid, evento), ...]"""
+        return [(t, eid, event) for t, _, eid, event in self._queue]
+    
+    def processed_events(self):
+        """Quantos eventos já foram processados (agendados menos pendentes)"""
+        return next(self._eid) - len(self._queue)
+
+
+def _wire(env, config, orders_queue, all_orders, metrics, arrivals, trace):
+    for key in LATENCY_METRICS:
+        metrics.setdefault(key, LatencyHistogram())
+    metrics.setdefault('timeline', MetricSeries(config.TIMELINE_BUCKET))
+    roads = RoadNetwork.from_config(config)
+    if roads is not None:
+        for key in ('routing_time', 'routed_dispatches', 'route_cache_hits', 'route_cache_misses'):
+            metrics.setdefault(key, 0)
+        roads.hits, roads.misses = metrics['route_cache_hits'], metrics['route_cache_misses']
+    context = env.context
+    context.update(
+        config=config,
+        orders_queue=orders_queue,
+        all_orders=all_orders,
+        metrics=metrics,
+        arrivals=arrivals,
+        trace=trace,
+        dispatch_signal=Signal(env),
+        overflow_signal=Signal(env),
+        on_complete=functools.partial(record_completion, metrics),
+        courier_index=GridIndex(config.SPATIAL_CELL_SIZE) if config.DISPATCH_SPATIAL_INDEX else None,
+        roads=roads,
+        couriers=[],
+    )
+    return context
+
+
+def _make_courier(env, cid, start_pos, name, autostart=True):
+    ctx = env.context
+    config = ctx['config']
+    c = Courier(env, cid, start_pos=start_pos, service_speed=config.SERVICE_SPEED, name=name,
+                metrics=ctx['metrics'], config=config, dispatch_signal=ctx['dispatch_signal'],
+                on_complete=ctx['on_complete'], spatial_index=ctx['courier_index'],
+                trace=ctx['trace'], roads=ctx['roads'], autostart=autostart)
+    ctx['couriers'].append(c)
+    return c
+
+
+def _start_process(env, name, **resume):
+    ctx = env.context
+    config = ctx['config']
+    if name == 'order_generator':
+        gen = order_generator(env, ctx['orders_queue'], ctx['all_orders'], ctx['metrics'], config,
+                              ctx['dispatch_signal'], ctx['overflow_signal'], ctx['arrivals'], ctx['trace'], **resume)
+    elif name == 'peak_monitor':
+        gen = peak_monitor(env, ctx['metrics'], config, **resume)
+    elif name == 'dispatcher':
+        gen = dispatcher(env, ctx['orders_queue'], ctx['couriers'], ctx['metrics'], config,
+                         ctx['dispatch_signal'], ctx['courier_index'], ctx['roads'])
+    elif name == 'abandonment_monitor':
+        gen = abandonment_monitor(env, ctx['orders_queue'], ctx['metrics'], config, ctx['overflow_signal'],
+                                  trace=ctx['trace'], **resume)
+    else:
+        raise ValueError(f"Processo desconhecido: {name}")
+    env.processes[name] = env.process(gen)
+
+
+def setup_simulation(config, trace=None):
     random.seed(config.SEED)
     np.random.seed(config.SEED)
     
-    env = simpy.Environment()
-    
-    orders_queue = deque()
-    all_orders = []
+    env = SimEnvironment()
     metrics = {
         'total_orders': 0,
         'assigned': 0,
@@ -26,20 +121,95 @@ def setup_simulation(config):
         'peak_end': 0,
         'peak_active': False
     }
+    ctx = _wire(env, config, OrderQueue(), OrderTable(), metrics, None, trace)
     
     courier_names = ["Pedro", "Fernando"]
-    couriers = []
     for i in range(config.NUM_COURIERS):
         start = (
             config.MAP_SIZE[0] // 2 + random.uniform(-50, 50),
             config.MAP_SIZE[1] // 2 + random.uniform(-50, 50)
         )
         name = courier_names[i] if i < len(courier_names) else f"Courier {i}"
-        c = Courier(env, i, start_pos=start, service_speed=config.SERVICE_SPEED, name=name, metrics=metrics, config=config)
-        couriers.append(c)
+        _make_courier(env, i, start, name)
+    if trace is not None:
+        trace.meta['couriers'] = [c.name for c in ctx['couriers']]
     
-    env.process(order_generator(env, orders_queue, all_orders, metrics, config))
-    env.process(dispatcher(env, orders_queue, couriers, metrics, config))
-    env.process(monitor_completions(env, metrics, all_orders, config))
+    peak_window = sample_peak_window(config)
+    if peak_window is not None:
+        metrics['peak_start'], metrics['peak_end'] = peak_window
+    ctx['arrivals'] = sample_arrivals(config, config.SIM_TIME, peak_window)
+    if trace is not None and peak_window is not None:
+        trace.meta['peak_window'] = [float(t) for t in peak_window]
     
+    for name in ('order_generator', 'peak_monitor', 'dispatcher', 'abandonment_monitor'):
+        _start_process(env, name)
+    
+    return env, ctx['couriers'], ctx['orders_queue'], ctx['all_orders'], metrics
+
+
+def restore_simulation(state, config, trace=None):
+    """Reconstrói a simulação a partir de um checkpoint e a deixa pronta para continuar.
+    
+    Os processos que aguardavam um timeout são recriados na ordem original dos eventos
+    pendentes e reagendados no instante exato gravado. Com o mesmo SEED o restante da
+    execução é idêntico ao da execução contínua; com outro SEED os geradores são
+    ressemeados, gerando um ramo independente a partir do mesmo estado.
+    """
+    saved = state['config']
+    for name in ('NUM_COURIERS', 'MOVEMENT_MODE'):
+        if getattr(config, name) != saved[name]:
+            raise ValueError(f"{name} difere do checkpoint ({saved[name]!r})")
+    
+    env = SimEnvironment(state['now'])
+    all_orders = OrderTable.from_snapshot(state['all_orders'])
+    orders_queue = OrderQueue(all_orders[i] for i in state['orders_queue'])
+    ctx = _wire(env, config, orders_queue, all_orders, copy.deepcopy(state['metrics']), state['arrivals'], trace)
+    
+    for cs in state['couriers']:
+        c = _make_courier(env, cs['id'], cs['pos'], cs['name'], autostart=False)
+        c.restore(cs, all_orders)
+        if c.status == "idle" and ctx['courier_index'] is not None:
+            ctx['courier_index'].insert(c, c.pos)
+    if trace is not None:
+        trace.meta['couriers'] = [c.name for c in ctx['couriers']]
+        if config.PEAK_ENABLED:
+            trace.meta['peak_window'] = [float(ctx['metrics']['peak_start']), float(ctx['metrics']['peak_end'])]
+        trace.restored_state(env.now, orders_queue, ctx['couriers'])
+    
+    for name, wake in state['processes']:
+        if isinstance(name, int):
+            ctx['couriers'][name].start()
+            continue
+        resume = {} if wake is None else {'resume_at': wake}
+        if name == 'order_generator':
+            resume['start'] = len(all_orders)
+        _start_process(env, name, **resume)
+    
+    if config.SEED == saved['SEED']:
+        random.setstate(state['random'])
+        np.random.set_state(state['np_random'])
+    else:
+        random.seed(config.SEED)
+        np.random.seed(config.SEED)
+    
+    return env, ctx['couriers'], orders_queue, all_orders, ctx['metrics']
+
+
+def create_simulation(config, trace=None):
+    """Nova simulação, ou a continuação de RESUME_FROM quando definido"""
+    if getattr(config, 'RESUME_FROM', None):
+        return restore_simulation(load_checkpoint(config.RESUME_FROM), config, trace)
+    return setup_simulation(config, trace)
+
+
+def run_headless(config):
+    """Executa a simulação até SIM_TIME sem renderização, o mais rápido possível"""
+    trace = open_trace(config)
+    try:
+        env, couriers, orders_queue, all_orders, metrics = create_simulation(config, trace)
+        env.run(until=config.SIM_TIME)
+        sync_route_stats(env.context)
+    finally:
+        if trace is not None:
+            trace.close()
     return env, couriers, orders_queue, all_orders, metrics
@@ -0,0 +1,99 @@
+import math
+import numpy as np
+
+
+LATENCY_METRICS = ('delivery_latency', 'wait_latency', 'transit_latency')
+
+
+class LatencyHistogram:
+    """Histograma de latências em baldes logarítmicos (estilo HDR), com memória constante.
+
+    Cada balde cobre um intervalo de largura relativa `precision`, então qualquer quantil
+    sai com erro relativo de no máximo precision / 2. Histogramas com a mesma configuração
+    se somam balde a balde, o que permite juntar replicações e regiões.
+    """
+
+    def __init__(self, min_value=0.01, max_value=1e6, precision=0.01):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        # Balde 0 recebe tudo até min_value; o último, tudo acima de max_value
+        n = int(math.ceil(math.log(max_value / min_value) / self._log_base)) + 2
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value):
+        if value <= self.min_value:
+            i = 0
+        else:
+            i = min(len(self.counts) - 1, int(math.log(value / self.min_value) / self._log_base) + 1)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _bucket_value(self, i):
+        # Ponto médio geométrico do balde, limitado aos extremos observados
+        if i == 0:
+            value = self.min_value
+        else:
+            value = self.min_value * math.exp((i - 0.5) * self._log_base)
+        return min(max(value, self.min), self.max)
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        i = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return self._bucket_value(i)
+
+    def quantiles(self, qs=(0.5, 0.95, 0.99)):
+        if not self.count:
+            return [0.0] * len(qs)
+        cumulative = np.cumsum(self.counts)
+        ranks = [max(1, math.ceil(q * self.count)) for q in qs]
+        return [self._bucket_value(int(i)) for i in np.searchsorted(cumulative, ranks)]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def bins(self):
+        """Bordas e contagens dos baldes entre o primeiro e o último não vazios"""
+        nonzero = np.flatnonzero(self.counts)
+        if not nonzero.size:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        lo, hi = nonzero[0], nonzero[-1] + 1
+        idx = np.arange(lo, hi + 1)
+        edges = self.min_value * np.exp(np.maximum(idx - 1, 0) * self._log_base)
+        edges[0] = min(edges[0], self.min)
+        edges[-1] = max(edges[-1], self.max)
+        return edges, self.counts[lo:hi]
+
+    def merge(self, other):
+        if (other.min_value, other.max_value, other.precision) != (self.min_value, self.max_value, self.precision):
+            raise ValueError("Histogramas com configurações diferentes não podem ser somados")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self):
+        clone = LatencyHistogram(self.min_value, self.max_value, self.precision)
+        return clone.merge(self)
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def __repr__(self):
+        p50, p95, p99 = self.quantiles()
+        return f"LatencyHistogram(n={self.count}, p50={p50:.1f}, p95={p95:.1f}, p99={p99:.1f})"
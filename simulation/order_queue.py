@@ -0,0 +1,25 @@
+class OrderQueue:
+    """Fila FIFO de pedidos com remoção O(1) de qualquer pedido"""
+    
+    def __init__(self, orders=()):
+        self._orders = {}
+        for o in orders:
+            self.append(o)
+    
+    def append(self, order):
+        self._orders[order.id] = order
+    
+    def remove(self, order):
+        del self._orders[order.id]
+    
+    def __contains__(self, order):
+        return order.id in self._orders
+    
+    def __iter__(self):
+        return iter(self._orders.values())
+    
+    def __len__(self):
+        return len(self._orders)
+    
+    def __repr__(self):
+        return f"OrderQueue({list(self._orders.values())})"
@@ -1,61 +1,76 @@
+import math
+import time
 import random
-import numpy as np
-from models import Order
+from .dispatch import build_score_matrix, solve_greedy_indexed, SOLVERS
 
 
-def order_generator(env, orders_queue, all_orders, metrics, config):
-    if config.PEAK_ENABLED:
-        peak_start = random.uniform(config.SIM_TIME * 0.3, config.SIM_TIME * 0.6)
-        peak_end = peak_start + config.PEAK_DURATION
-        metrics['peak_start'] = peak_start
-        metrics['peak_end'] = peak_end
-        metrics['peak_active'] = False
-    
-    while env.now < config.SIM_TIME:
-        in_peak = False
-        if config.PEAK_ENABLED and peak_start <= env.now < peak_end:
-            in_peak = True
-            if not metrics['peak_active']:
-                metrics['peak_active'] = True
-                print(f"\n🔥 PICO DE PEDIDOS INICIADO! Tempo: {round(env.now, 1)}s")
-        elif config.PEAK_ENABLED and env.now >= peak_end and metrics['peak_active']:
-            metrics['peak_active'] = False
-            print(f"\n✅ Pico de pedidos finalizado. Tempo: {round(env.now, 1)}s\n")
-        
-        if in_peak:
-            inter = np.random.exponential(config.INTERARRIVAL_MEAN / config.PEAK_MULTIPLIER)
-        else:
-            inter = np.random.exponential(config.INTERARRIVAL_MEAN)
-        
-        yield env.timeout(inter)
-        
-        pickup = (
-            random.uniform(50, config.MAP_SIZE[0] - 50),
-            random.uniform(50, config.MAP_SIZE[1] - 50)
-        )
-        dropoff = (
-            random.uniform(50, config.MAP_SIZE[0] - 50),
-            random.uniform(50, config.MAP_SIZE[1] - 50)
-        )
+def _sleep(env, delay, resume_at=None):
+    # Ao retomar de um checkpoint, o primeiro despertar volta no instante exato gravado
+    return env.timeout(delay) if resume_at is None else env.timeout_at(resume_at)
+
+
+def order_generator(env, orders_queue, all_orders, metrics, config, dispatch_signal, overflow_signal, arrivals, trace=None, start=0, resume_at=None):
+    # Apenas reproduz as chegadas pré-amostradas; nenhum sorteio dentro do laço de eventos
+    for i in range(start, len(arrivals)):
+        yield _sleep(env, arrivals.times[i] - env.now, resume_at)
+        resume_at = None
         
-        o = Order(env, pickup, dropoff, env.now)
+        o = all_orders.create(arrivals.pickups[i], arrivals.dropoffs[i], env.now, arrivals.priorities[i])
         orders_queue.append(o)
-        all_orders.append(o)
         metrics['total_orders'] += 1
+        metrics['timeline'].record('created', env.now)
+        if trace is not None:
+            trace.order_event(env.now, 'created', o)
+        dispatch_signal.notify()
+        if len(orders_queue) > config.MAX_QUEUE_FORGIVE:
+            overflow_signal.notify()
 
 
-def dispatcher(env, orders_queue, couriers, metrics, config):
+def peak_monitor(env, metrics, config, resume_at=None):
+    if not config.PEAK_ENABLED:
+        return
+    
+    if not metrics['peak_active']:
+        yield _sleep(env, max(0.0, metrics['peak_start'] - env.now), resume_at)
+        resume_at = None
+        metrics['peak_active'] = True
+        if config.VERBOSE:
+            print(f"\n🔥 PICO DE PEDIDOS INICIADO! Tempo: {round(env.now, 1)}s")
+    
+    yield _sleep(env, max(0.0, metrics['peak_end'] - env.now), resume_at)
+    metrics['peak_active'] = False
+    if config.VERBOSE:
+        print(f"\n✅ Pico de pedidos finalizado. Tempo: {round(env.now, 1)}s\n")
+
+
+def dispatcher(env, orders_queue, couriers, metrics, config, dispatch_signal, courier_index=None, roads=None):
+    # Acorda apenas quando chega um pedido ou um entregador fica livre
     while env.now < config.SIM_TIME:
-        _handle_order_abandonment(env, orders_queue, metrics, config)
-        assigned_any = _assign_orders(orders_queue, couriers, metrics, env)
-        
-        if not assigned_any:
-            yield env.timeout(0.5)
+        yield dispatch_signal.wait()
+        # O índice espacial usa distância euclidiana; com rede viária o score vem das rotas
+        if courier_index is not None and roads is None and config.DISPATCH_SOLVER == "greedy":
+            _assign_orders_indexed(orders_queue, courier_index, metrics, env)
         else:
-            yield env.timeout(0.01)
+            _assign_orders(orders_queue, couriers, metrics, env, config.DISPATCH_SOLVER, roads)
+
+
+def abandonment_monitor(env, orders_queue, metrics, config, overflow_signal, tick=0.5, trace=None, resume_at=None):
+    if resume_at is not None:
+        yield env.timeout_at(resume_at)
+    while env.now < config.SIM_TIME:
+        if len(orders_queue) <= config.MAX_QUEUE_FORGIVE:
+            # Com a fila abaixo do limite ninguém desiste; dorme até ela crescer
+            yield overflow_signal.wait()
+            next_tick = math.ceil(env.now / tick) * tick
+            if next_tick > env.now:
+                yield env.timeout(next_tick - env.now)
+            continue
+        
+        _handle_order_abandonment(env, orders_queue, metrics, config, trace)
+        yield env.timeout(tick)
 
 
-def _handle_order_abandonment(env, orders_queue, metrics, config):
+def _handle_order_abandonment(env, orders_queue, metrics, config, trace=None):
     for o in list(orders_queue):
         wait_time = env.now - o.created
         if len(orders_queue) > config.MAX_QUEUE_FORGIVE and wait_time > 0:
@@ -66,6 +81,12 @@ def _handle_order_abandonment(env, orders_queue, metrics, config):
             if random.random() < p_give:
                 orders_queue.remove(o)
                 metrics['desisted'] += 1
+                metrics['timeline'].record('desisted', env.now)
+                if trace is not None:
+                    trace.order_event(env.now, 'desisted', o)
+                
+                if not config.VERBOSE:
+                    continue
                 
                 if wait_time > 300:
                     reason = "Tempo de espera muito longo"
@@ -77,56 +98,61 @@ def _handle_order_abandonment(env, orders_queue, metrics, config):
                 print(f"Pedido #{o.id} desistiu - Motivo: {reason} (Espera: {round(wait_time, 1)}s, Fila: {len(orders_queue)+1})")
 
 
-def _assign_orders(orders_queue, couriers, metrics, env):
-    assigned_any = False
+def _assign_orders(orders_queue, couriers, metrics, env, solver="greedy", roads=None):
+    free = [c for c in couriers if c.status == "idle"]
+    if not free or not orders_queue:
+        return False
     
-    while orders_queue:
-        free = [c for c in couriers if c.status == "idle"]
-        if not free:
-            break
-        
-        best_score = float('inf')
-        best_courier = None
-        best_order = None
-        
-        for order in list(orders_queue):
-            wait_time = env.now - order.created
-            base_priority = getattr(order, 'base_priority', 2.0)
-            
-            for courier in free:
-                dist = courier.distance_to(order.pickup)
-                priority_bonus = -(base_priority - 2.0) * 30.0
-                score = dist + wait_time * 5.0 + priority_bonus
-                
-                if score < best_score:
-                    best_score = score
-                    best_courier = courier
-                    best_order = order
-        
-        if best_order and best_courier:
-            orders_queue.remove(best_order)
-            best_courier.assign(best_order)
-            metrics['assigned'] += 1
-            assigned_any = True
-            free.remove(best_courier)
-        else:
-            break
+    orders = list(orders_queue)
+    if roads is None:
+        scores = build_score_matrix(orders, free, env.now)
+    else:
+        t0 = time.perf_counter()
+        scores = build_score_matrix(orders, free, env.now, roads)
+        metrics['routing_time'] += time.perf_counter() - t0
+        metrics['routed_dispatches'] += 1
+    pairs = SOLVERS[solver](scores)
+    
+    for row, col in pairs:
+        orders_queue.remove(orders[row])
+        free[col].assign(orders[row])
+        metrics['assigned'] += 1
+        metrics['timeline'].record('assigned', env.now)
     
-    return assigned_any
+    return bool(pairs)
 
 
-def monitor_completions(env, metrics, all_orders, config):
-    if 'total_delivery_time' not in metrics:
-        metrics['total_delivery_time'] = 0.0
-    if 'accidents' not in metrics:
-        metrics['accidents'] = 0
+def _assign_orders_indexed(orders_queue, courier_index, metrics, env):
+    if not orders_queue or not len(courier_index):
+        return False
     
-    while env.now < config.SIM_TIME:
-        for o in list(all_orders):
-            if o.completed and not getattr(o, "_counted", False):
-                metrics['completed'] += 1
-                delivery_time = o.completed - o.created
-                metrics['total_delivery_time'] += delivery_time
-                setattr(o, "_counted", True)
-        
-        yield env.timeout(0.5)
+    orders = list(orders_queue)
+    pairs = solve_greedy_indexed(orders, courier_index, env.now)
+    
+    for row, courier in pairs:
+        orders_queue.remove(orders[row])
+        courier.assign(orders[row])
+        metrics['assigned'] += 1
+        metrics['timeline'].record('assigned', env.now)
+    
+    return bool(pairs)
+
+
+def record_completion(metrics, order):
+    created, completed = order.created, order.completed
+    metrics['completed'] += 1
+    metrics['total_delivery_time'] += completed - created
+    metrics['delivery_latency'].record(completed - created)
+    metrics['wait_latency'].record(order.assigned - created)
+    metrics['transit_latency'].record(completed - order.picked)
+    metrics['timeline'].record('completed', completed)
+
+
+def sync_route_stats(context):
+    """Copia para metrics os contadores do cache de rotas, que também recebe as consultas
+    de Courier.route(); chamada sempre que as métricas saem da simulação"""
+    roads = context['roads']
+    if roads is not None:
+        metrics = context['metrics']
+        metrics['route_cache_hits'] = roads.hits
+        metrics['route_cache_misses'] = roads.misses
@@ -0,0 +1,108 @@
+import math
+import copy
+import operator
+import functools
+import numpy as np
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+
+from .environment import run_headless
+from .latency import LATENCY_METRICS
+
+
+# Valores críticos t de Student bicaudais a 95% para 1..30 graus de liberdade
+_T_CRITICAL_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+SCALAR_METRICS = [
+    'success_rate',
+    'mean_delivery_time',
+    'p50_delivery_time',
+    'p95_delivery_time',
+    'p99_delivery_time',
+    'accidents',
+    'total_orders',
+    'completed',
+    'desisted',
+]
+
+
+def make_config(base, **overrides):
+    """Cópia isolada das constantes de configuração, segura para enviar a outros processos"""
+    values = {
+        name: copy.deepcopy(getattr(base, name))
+        for name in dir(base)
+        if name.isupper()
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def derive_seeds(seed, n):
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n)]
+
+
+def summarize_run(env, couriers, orders_queue, all_orders, metrics):
+    p50, p95, p99 = metrics['delivery_latency'].quantiles((0.5, 0.95, 0.99))
+    return {
+        'success_rate': metrics['completed'] / max(1, metrics['total_orders']) * 100,
+        'mean_delivery_time': metrics['delivery_latency'].mean,
+        'p50_delivery_time': p50,
+        'p95_delivery_time': p95,
+        'p99_delivery_time': p99,
+        'accidents': metrics['accidents'],
+        'total_orders': metrics['total_orders'],
+        'completed': metrics['completed'],
+        'desisted': metrics['desisted'],
+        'utilization': [c.utilization * 100 for c in couriers],
+        'couriers': [c.name for c in couriers],
+        'latency': {key: metrics[key] for key in LATENCY_METRICS},
+    }
+
+
+def run_replication(config):
+    return summarize_run(*run_headless(config))
+
+
+def confidence_interval(values, level_table=_T_CRITICAL_95):
+    """Média e meia-largura do intervalo de confiança de 95%"""
+    values = np.asarray(values, dtype=float)
+    n = values.size
+    mean = float(values.mean()) if n else 0.0
+    if n < 2:
+        return mean, 0.0
+    t = level_table[n - 2] if n - 1 <= len(level_table) else 1.96
+    return mean, t * float(values.std(ddof=1)) / math.sqrt(n)
+
+
+def aggregate(runs):
+    summary = {'replications': len(runs)}
+    for name in SCALAR_METRICS:
+        summary[name] = confidence_interval([r[name] for r in runs])
+    
+    n_couriers = min(len(r['utilization']) for r in runs) if runs else 0
+    summary['couriers'] = runs[0]['couriers'][:n_couriers] if runs else []
+    summary['utilization'] = [
+        confidence_interval([r['utilization'][i] for r in runs])
+        for i in range(n_couriers)
+    ]
+    # Histogramas somados: percentis de todas as entregas de todas as replicações juntas
+    summary['pooled_latency'] = {
+        key: functools.reduce(operator.add, (r['latency'][key] for r in runs))
+        for key in LATENCY_METRICS
+    } if runs else {}
+    return summary
+
+
+def replicate(base_config, n, workers=None):
+    """Executa n replicações independentes em paralelo, cada uma com semente derivada de SEED"""
+    configs = [
+        make_config(base_config, SEED=seed, VERBOSE=False)
+        for seed in derive_seeds(base_config.SEED, n)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        runs = list(pool.map(run_replication, configs))
+    return aggregate(runs), runs
@@ -0,0 +1,211 @@
+import json
+import heapq
+from collections import OrderedDict
+import numpy as np
+
+
+class RoadNetwork:
+    """Grafo de ruas não direcionado com caminhos mínimos em cache.
+
+    O custo de uma aresta é o comprimento multiplicado pelo fator de lentidão da via,
+    então custo / velocidade é o tempo de percurso. Pontos fora da rede são ligados ao
+    nó mais próximo em linha reta. Cada Dijkstra calcula a linha inteira (distâncias e
+    predecessores) a partir de uma origem, guardada em um cache LRU.
+    """
+
+    def __init__(self, nodes, edges, cache_size=1024):
+        self.nodes = np.asarray(nodes, dtype=float).reshape(-1, 2)
+        self._adj = [[] for _ in range(len(self.nodes))]
+        self._factors = {}
+        for edge in edges:
+            u, v = int(edge[0]), int(edge[1])
+            factor = float(edge[2]) if len(edge) > 2 else 1.0
+            cost = float(np.linalg.norm(self.nodes[u] - self.nodes[v])) * factor
+            self._adj[u].append((v, cost))
+            self._adj[v].append((u, cost))
+            self._factors[u, v] = self._factors[v, u] = factor
+
+        self._active = self._largest_component()
+        self._active_nodes = self.nodes[self._active]
+        self._grid = None
+
+        self.cache_size = cache_size
+        self._rows = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def grid(cls, map_size, spacing=50.0, blocked=0.0, slow_zones=None, seed=0, cache_size=1024):
+        """Grade de ruas a cada `spacing` unidades.
+
+        `blocked` é a fração de cruzamentos bloqueados (sorteada com `seed`) ou uma lista de
+        retângulos (x0, y0, x1, y1); `slow_zones` é uma lista de (x0, y0, x1, y1, fator).
+        """
+        xs = np.arange(0.0, map_size[0] + 1e-9, spacing)
+        ys = np.arange(0.0, map_size[1] + 1e-9, spacing)
+        gx, gy = np.meshgrid(xs, ys, indexing='ij')
+        nodes = np.column_stack((gx.ravel(), gy.ravel()))
+
+        if isinstance(blocked, (int, float)):
+            rng = np.random.default_rng(seed)
+            is_blocked = rng.random(len(nodes)) < blocked
+        else:
+            is_blocked = np.zeros(len(nodes), dtype=bool)
+            for x0, y0, x1, y1 in blocked:
+                is_blocked |= _inside(nodes, x0, y0, x1, y1)
+
+        idx = np.arange(len(nodes)).reshape(len(xs), len(ys))
+        edges = []
+        for a, b in ((idx[:-1, :], idx[1:, :]), (idx[:, :-1], idx[:, 1:])):
+            for u, v in zip(a.ravel().tolist(), b.ravel().tolist()):
+                if is_blocked[u] or is_blocked[v]:
+                    continue
+                factor = 1.0
+                mid = (nodes[u] + nodes[v]) / 2
+                for x0, y0, x1, y1, slow in slow_zones or ():
+                    if x0 <= mid[0] <= x1 and y0 <= mid[1] <= y1:
+                        factor = max(factor, float(slow))
+                edges.append((u, v, factor))
+
+        network = cls(nodes, edges, cache_size)
+        lookup = np.full(len(nodes), -1, dtype=np.int64)
+        lookup[network._active] = network._active
+        network._grid = (spacing, len(xs), len(ys), lookup)
+        return network
+
+    @classmethod
+    def load(cls, path, cache_size=1024):
+        """Lê {"nodes": [[x, y], ...], "edges": [[u, v], [u, v, fator], ...]} de um JSON"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['nodes'], data['edges'], cache_size)
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.ROAD_NETWORK:
+            return None
+        if config.ROAD_NETWORK == "grid":
+            return cls.grid(config.MAP_SIZE, config.ROAD_GRID_SPACING, config.ROAD_BLOCKED,
+                            config.ROAD_SLOW_ZONES, config.ROAD_SEED, config.ROAD_CACHE_SIZE)
+        return cls.load(config.ROAD_NETWORK, config.ROAD_CACHE_SIZE)
+
+    def _largest_component(self):
+        # Bloqueios podem isolar partes da grade; só o maior componente é usado
+        seen = np.zeros(len(self.nodes), dtype=bool)
+        best = []
+        for root in range(len(self.nodes)):
+            if seen[root] or not self._adj[root]:
+                continue
+            seen[root] = True
+            comp = [root]
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                for v, _ in self._adj[u]:
+                    if not seen[v]:
+                        seen[v] = True
+                        comp.append(v)
+                        stack.append(v)
+            if len(comp) > len(best):
+                best = comp
+        return np.array(sorted(best), dtype=np.int64)
+
+    def snap(self, points):
+        """Nó da rede mais próximo de cada ponto e a distância até ele"""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        nodes = np.full(len(points), -1, dtype=np.int64)
+
+        if self._grid is not None:
+            spacing, nx, ny, lookup = self._grid
+            ix = np.clip(np.rint(points[:, 0] / spacing), 0, nx - 1).astype(np.int64)
+            iy = np.clip(np.rint(points[:, 1] / spacing), 0, ny - 1).astype(np.int64)
+            nodes = lookup[ix * ny + iy]
+
+        missing = np.flatnonzero(nodes < 0)
+        for start in range(0, len(missing), 256):
+            chunk = missing[start:start + 256]
+            d2 = ((points[chunk, None, :] - self._active_nodes[None, :, :]) ** 2).sum(axis=2)
+            nodes[chunk] = self._active[np.argmin(d2, axis=1)]
+
+        offsets = np.linalg.norm(points - self.nodes[nodes], axis=1)
+        return nodes, offsets
+
+    def _row(self, source):
+        row = self._rows.get(source)
+        if row is not None:
+            self.hits += 1
+            self._rows.move_to_end(source)
+            return row
+
+        self.misses += 1
+        row = self._dijkstra(source)
+        self._rows[source] = row
+        if len(self._rows) > self.cache_size:
+            self._rows.popitem(last=False)
+        return row
+
+    def _dijkstra(self, source):
+        pred = [-1] * len(self.nodes)
+        d = [float('inf')] * len(self.nodes)
+        d[source] = 0.0
+        heap = [(0.0, source)]
+        adj = self._adj
+        while heap:
+            du, u = heapq.heappop(heap)
+            if du > d[u]:
+                continue
+            for v, cost in adj[u]:
+                nd = du + cost
+                if nd < d[v]:
+                    d[v] = nd
+                    pred[v] = u
+                    heapq.heappush(heap, (nd, v))
+        return np.array(d), pred
+
+    def distance_matrix(self, targets, sources):
+        """Custo de rota de cada origem (colunas) até cada destino (linhas)"""
+        target_nodes, target_off = self.snap(targets)
+        source_nodes, source_off = self.snap(sources)
+
+        rows = np.empty((len(source_nodes), len(target_nodes)))
+        for j, node in enumerate(source_nodes.tolist()):
+            rows[j] = self._row(node)[0][target_nodes]
+        return rows.T + target_off[:, None] + source_off[None, :]
+
+    def route(self, start, end):
+        """Waypoints [(ponto, fator), ...] do caminho mínimo de start até end"""
+        start = np.asarray(start, dtype=float)
+        end = np.asarray(end, dtype=float)
+        (s, t), _ = self.snap(np.vstack((start, end)))
+        _, pred = self._row(int(s))
+
+        path = [int(t)]
+        while path[-1] != s:
+            path.append(pred[path[-1]])
+        path.reverse()
+
+        points = np.vstack((start, self.nodes[path], end))
+        factors = np.ones(len(points) - 1)
+        factors[1:-1] = [self._factors[u, v] for u, v in zip(path, path[1:])]
+
+        # Descarta trechos de comprimento zero e funde trechos colineares de mesma velocidade,
+        # para que uma avenida reta vire um único evento de movimento
+        seg = np.diff(points, axis=0)
+        keep = np.any(seg != 0, axis=1)
+        ends, seg, factors = points[1:][keep], seg[keep], factors[keep]
+        if len(seg) > 1:
+            cross = seg[:-1, 0] * seg[1:, 1] - seg[:-1, 1] * seg[1:, 0]
+            dot = (seg[:-1] * seg[1:]).sum(axis=1)
+            merged = (np.abs(cross) < 1e-9) & (dot > 0) & (factors[:-1] == factors[1:])
+            keep = np.append(~merged, True)
+            ends, factors = ends[keep], factors[keep]
+        return list(zip(ends, factors.tolist()))
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _inside(points, x0, y0, x1, y1):
+    return (points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
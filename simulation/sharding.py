@@ -0,0 +1,461 @@
+import math
+import random
+import multiprocessing
+import numpy as np
+from types import SimpleNamespace
+
+from models import OrderTable
+from .environment import SimEnvironment, _wire, _make_courier, _start_process
+from .processes import sync_route_stats
+from .order_queue import OrderQueue
+from .demand import ArrivalStream, sample_peak_window, sample_arrivals
+from .replication import make_config, derive_seeds
+
+
+def shard_grid(n, map_size):
+    """Divide o mapa em n regiões (colunas × linhas) o mais próximas possível de quadrados"""
+    best = None
+    for cols in range(1, n + 1):
+        if n % cols:
+            continue
+        rows = n // cols
+        cell_ratio = (map_size[0] / cols) / (map_size[1] / rows)
+        score = abs(math.log(cell_ratio))
+        if best is None or score < best[0]:
+            best = (score, cols, rows)
+    return best[1], best[2]
+
+
+class ShardLayout:
+    """Partição retangular do mapa; cada região é simulada por um processo"""
+
+    def __init__(self, map_size, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.width = map_size[0] / cols
+        self.height = map_size[1] / rows
+
+    def __len__(self):
+        return self.cols * self.rows
+
+    def region_of(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        ix = np.clip((points[:, 0] // self.width).astype(np.int64), 0, self.cols - 1)
+        iy = np.clip((points[:, 1] // self.height).astype(np.int64), 0, self.rows - 1)
+        return ix + iy * self.cols
+
+    def bounds(self, shard):
+        ix, iy = shard % self.cols, shard // self.cols
+        return (ix * self.width, iy * self.height, (ix + 1) * self.width, (iy + 1) * self.height)
+
+    def distance(self, point, shard):
+        x0, y0, x1, y1 = self.bounds(shard)
+        dx = max(x0 - point[0], 0.0, point[0] - x1)
+        dy = max(y0 - point[1], 0.0, point[1] - y1)
+        return math.hypot(dx, dy)
+
+
+class CourierSummary:
+    """Resultado de um entregador ao fim de uma execução particionada"""
+
+    def __init__(self, cid, name, total_busy_time, total_deliveries, current_order, now):
+        self.id = cid
+        self.name = name
+        self.total_busy_time = total_busy_time
+        self.total_deliveries = total_deliveries
+        self.current_order = current_order
+        self.now = now
+
+    @property
+    def utilization(self):
+        if self.now > 0:
+            return self.total_busy_time / self.now
+        return 0.0
+
+    def __repr__(self):
+        return f"CourierSummary(id={self.id}, deliveries={self.total_deliveries})"
+
+
+class ShardWorker:
+    """Uma região do mapa com seu próprio ambiente SimPy.
+
+    Pedidos gerados na região e pedidos recebidos de outras regiões dividem a mesma
+    tabela; `row_gids` guarda o id global (índice da chegada) de cada linha, usado para
+    juntar as tabelas no final.
+    """
+
+    def __init__(self, config, shard, layout, arrivals, gids, couriers, peak_window, rng_state):
+        if rng_state is None:
+            seed = derive_seeds(config.SEED, len(layout))[shard]
+            random.seed(seed)
+            np.random.seed(seed)
+        else:
+            random.setstate(rng_state[0])
+            np.random.set_state(rng_state[1])
+
+        self.shard = shard
+        self.layout = layout
+        self.gids = gids
+        self.row_gids = []
+        self.generated = 0
+        self.dead = set()
+
+        self.env = SimEnvironment()
+        metrics = {
+            'total_orders': 0,
+            'assigned': 0,
+            'completed': 0,
+            'desisted': 0,
+            'in_progress': 0,
+            'accidents': 0,
+            'total_delivery_time': 0.0,
+            'peak_start': 0,
+            'peak_end': 0,
+            'peak_active': False
+        }
+        if peak_window is not None:
+            metrics['peak_start'], metrics['peak_end'] = peak_window
+        self.ctx = _wire(self.env, config, OrderQueue(), OrderTable(), metrics, arrivals, None)
+        for state in couriers:
+            self._add_courier(state)
+        for name in ('order_generator', 'peak_monitor', 'dispatcher', 'abandonment_monitor'):
+            _start_process(self.env, name)
+
+    def _sync_gids(self):
+        # Linhas criadas pelo order_generator desde a última sincronização seguem a ordem das chegadas
+        new = len(self.ctx['all_orders']) - len(self.row_gids)
+        self.row_gids.extend(self.gids[self.generated:self.generated + new].tolist())
+        self.generated += new
+
+    def _gid(self, order):
+        self._sync_gids()
+        return self.row_gids[order.id]
+
+    def _export_order(self, order):
+        self.dead.add(order.id)
+        return {
+            'gid': self._gid(order),
+            'created': order.created,
+            'assigned': order.assigned,
+            'picked': order.picked,
+            'pickup': order.pickup,
+            'dropoff': order.dropoff,
+            'base_priority': order.base_priority,
+        }
+
+    def _import_order(self, data):
+        self._sync_gids()
+        order = self.ctx['all_orders'].create(data['pickup'], data['dropoff'], data['created'], data['base_priority'])
+        order.assigned = data.get('assigned')
+        order.picked = data.get('picked')
+        self.row_gids.append(data['gid'])
+        return order
+
+    def _add_courier(self, state):
+        snapshot = state.get('snapshot')
+        if snapshot is None:
+            c = _make_courier(self.env, state['id'], state['pos'], state['name'])
+            c.total_busy_time = state['total_busy_time']
+            c.total_deliveries = state['total_deliveries']
+            return c
+
+        # Entregador em qualquer fase: o snapshot continua no instante exato gravado
+        local = {o['gid']: self._import_order(o).id for o in state['orders']}
+        snapshot = dict(snapshot)
+        for key in ('current_order', 'pending_order'):
+            if snapshot[key] is not None:
+                snapshot[key] = local[snapshot[key]]
+        c = _make_courier(self.env, snapshot['id'], snapshot['pos'], snapshot['name'], autostart=False)
+        c.restore(snapshot, self.ctx['all_orders'])
+        if c.status == "idle" and self.ctx['courier_index'] is not None:
+            self.ctx['courier_index'].insert(c, c.pos)
+        c.start()
+        return c
+
+    def _destination(self, c):
+        # Região onde o entregador ficará livre: a entrega do pedido atual (ou pendente),
+        # ou a posição atual se estiver parado
+        order = c.current_order
+        if order is None and c.assigned_event is not None and c.assigned_event.triggered:
+            order = c.assigned_event.value
+        return c.pos if order is None else order.dropoff
+
+    def run(self, until, orders_in=()):
+        """Recebe os pedidos repassados na última barreira e simula até `until`"""
+        ctx = self.ctx
+        for o in orders_in:
+            ctx['orders_queue'].append(self._import_order(o))
+        if orders_in:
+            ctx['dispatch_signal'].notify()
+            if len(ctx['orders_queue']) > ctx['config'].MAX_QUEUE_FORGIVE:
+                ctx['overflow_signal'].notify()
+
+        self.env.run(until=until)
+        return self._release_couriers()
+
+    def _release_couriers(self):
+        # No modo "analytic" o entregador muda de região em qualquer fase, levando o pedido
+        # junto; no "stepped" (sem snapshot) só entregadores parados trocam de região
+        ctx = self.ctx
+        analytic = ctx['config'].MOVEMENT_MODE == "analytic"
+        leaving = []
+        for c in ctx['couriers']:
+            if not analytic and not self._is_free(c):
+                continue
+            dest = self._destination(c)
+            if self.layout.region_of(dest)[0] != self.shard:
+                leaving.append((c, dest))
+
+        states = []
+        for c, dest in leaving:
+            c.detach()
+            ctx['couriers'].remove(c)
+            state = {
+                'id': c.id,
+                'name': c.name,
+                'pos': c.pos.copy(),
+                'dest': dest,
+                'free': self._is_free(c),
+                'total_busy_time': c.total_busy_time,
+                'total_deliveries': c.total_deliveries,
+            }
+            if analytic:
+                snapshot = c.snapshot()
+                snapshot['legs'] = []  # rastro visual, sem uso fora da janela
+                state['orders'] = []
+                for key in ('current_order', 'pending_order'):
+                    if snapshot[key] is not None:
+                        exported = self._export_order(ctx['all_orders'][snapshot[key]])
+                        state['orders'].append(exported)
+                        snapshot[key] = exported['gid']
+                state['snapshot'] = snapshot
+            states.append(state)
+        free = sum(1 for c in ctx['couriers'] if self._is_free(c))
+        return states, len(ctx['couriers']), free, len(ctx['orders_queue'])
+
+    @staticmethod
+    def _is_free(c):
+        return c.status == "idle" and not (c.assigned_event is not None and c.assigned_event.triggered)
+
+    def exchange(self, couriers_in, n_export):
+        """Recebe entregadores e devolve os `n_export` pedidos mais antigos da fila para repasse"""
+        for state in couriers_in:
+            self._add_courier(state)
+        if couriers_in:
+            self.ctx['dispatch_signal'].notify()
+
+        queue = self.ctx['orders_queue']
+        orders = []
+        for o in list(queue)[:n_export]:
+            queue.remove(o)
+            orders.append(self._export_order(o))
+        return orders
+
+    def finish(self):
+        ctx = self.ctx
+        # Fila e ocupação integradas até o fim em todas as regiões antes da soma
+        ctx['metrics']['timeline'].advance(self.env.now)
+        sync_route_stats(ctx)
+        table = ctx['all_orders']
+        self._sync_gids()
+        live = np.array([i for i in range(len(table)) if i not in self.dead], dtype=np.int64)
+        columns = {name: table.column(name)[live] for name in OrderTable.COLUMNS}
+
+        couriers = [{
+            'id': c.id,
+            'name': c.name,
+            'total_busy_time': c.total_busy_time,
+            'total_deliveries': c.total_deliveries,
+            'current_order': self._gid(c.current_order) if c.current_order is not None else None,
+        } for c in ctx['couriers']]
+
+        return {
+            'columns': columns,
+            'gids': np.array(self.row_gids, dtype=np.int64)[live],
+            'queue': [self._gid(o) for o in ctx['orders_queue']],
+            'couriers': couriers,
+            'metrics': ctx['metrics'],
+            'now': self.env.now,
+        }
+
+
+def _serve(conn, *args):
+    worker = ShardWorker(*args)
+    while True:
+        command, payload = conn.recv()
+        if command == 'run':
+            conn.send(worker.run(*payload))
+        elif command == 'exchange':
+            conn.send(worker.exchange(*payload))
+        elif command == 'finish':
+            conn.send(worker.finish())
+            break
+    conn.close()
+
+
+def _merge_metrics(results):
+    # Contadores são somados; janela e estado do pico são globais e iguais em todas as regiões
+    merged = dict(results[0]['metrics'])
+    for result in results[1:]:
+        for key, value in result['metrics'].items():
+            if key in ('peak_start', 'peak_end', 'peak_active'):
+                continue
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def _merge(results):
+    gids = np.concatenate([r['gids'] for r in results])
+    order = np.argsort(gids, kind='stable')
+    columns = {
+        name: np.concatenate([r['columns'][name] for r in results])[order]
+        for name in OrderTable.COLUMNS
+    }
+    all_orders = OrderTable.from_snapshot({
+        'columns': columns,
+        'priority_block': 1024,
+        'priority_pool': np.empty(0),
+        'priority_next': 0,
+    })
+    position = dict(zip(gids[order].tolist(), range(len(gids))))
+
+    now = results[0]['now']
+    couriers = sorted((
+        CourierSummary(c['id'], c['name'], c['total_busy_time'], c['total_deliveries'],
+                       None if c['current_order'] is None else all_orders[position[c['current_order']]], now)
+        for r in results for c in r['couriers']
+    ), key=lambda c: c.id)
+    orders_queue = OrderQueue(all_orders[position[g]] for r in results for g in r['queue'])
+    return couriers, orders_queue, all_orders, _merge_metrics(results)
+
+
+def _plan_order_handover(counts, free, queued):
+    """Quantos pedidos cada região repassa e quantos entregadores livres sobram em cada uma.
+
+    Com um único despacho global, um entregador livre atende a fila de qualquer região; aqui
+    a fila que excede os livres da região vai para regiões com livres sobrando. Uma região
+    sem nenhum entregador repassa a fila inteira.
+    """
+    spare = [max(0, f - q) for f, q in zip(free, queued)]
+    available = sum(spare)
+    if not any(counts):
+        return [0] * len(counts), spare
+    exports = []
+    for count, f, q in zip(counts, free, queued):
+        if not count:
+            n = q
+        else:
+            n = min(max(0, q - f), available)
+            available -= n
+        exports.append(n)
+    return exports, spare
+
+
+def run_sharded(config, n_shards=None, window=None):
+    """Executa a simulação particionada geograficamente, um processo por região.
+
+    As regiões avançam em janelas conservadoras de `window` segundos. Em cada barreira,
+    cada entregador passa para a região onde ficará livre (a do destino da entrega em
+    curso, levando o pedido junto), e pedidos que a região não consegue atender vão para
+    a região vizinha com entregadores livres. MAX_QUEUE_FORGIVE é dividido entre as
+    regiões. Com uma única região o resultado é idêntico ao de run_headless.
+    """
+    if getattr(config, 'RESUME_FROM', None):
+        raise ValueError("Execução particionada não suporta RESUME_FROM")
+    n_shards = n_shards or config.SHARDS
+    window = window or config.SHARD_WINDOW
+    layout = ShardLayout(config.MAP_SIZE, *shard_grid(n_shards, config.MAP_SIZE))
+    # O limite de fila vale para a fila inteira; cada região recebe a sua parte dele
+    config = make_config(config, VERBOSE=False, TRACE_PATH=None,
+                         MAX_QUEUE_FORGIVE=max(1, round(config.MAX_QUEUE_FORGIVE / len(layout))))
+
+    # Mesmos sorteios e na mesma ordem de setup_simulation; a região 0 continua os geradores
+    random.seed(config.SEED)
+    np.random.seed(config.SEED)
+    courier_names = ["Pedro", "Fernando"]
+    starts = []
+    for i in range(config.NUM_COURIERS):
+        start = (
+            config.MAP_SIZE[0] // 2 + random.uniform(-50, 50),
+            config.MAP_SIZE[1] // 2 + random.uniform(-50, 50)
+        )
+        name = courier_names[i] if i < len(courier_names) else f"Courier {i}"
+        starts.append({'id': i, 'name': name, 'pos': start, 'total_busy_time': 0.0, 'total_deliveries': 0})
+    peak_window = sample_peak_window(config)
+    arrivals = sample_arrivals(config, config.SIM_TIME, peak_window)
+    rng_state = (random.getstate(), np.random.get_state())
+
+    arrival_region = layout.region_of(arrivals.pickups)
+    courier_region = layout.region_of([s['pos'] for s in starts]) if starts else np.empty(0, dtype=np.int64)
+
+    ctx = multiprocessing.get_context()
+    conns, procs = [], []
+    for shard in range(len(layout)):
+        gids = np.flatnonzero(arrival_region == shard)
+        local = ArrivalStream(arrivals.times[gids], arrivals.pickups[gids],
+                              arrivals.dropoffs[gids], arrivals.priorities[gids])
+        couriers = [s for s, r in zip(starts, courier_region) if r == shard]
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_serve, daemon=True, args=(
+            child, config, shard, layout, local, gids, couriers, peak_window,
+            rng_state if shard == 0 else None))
+        proc.start()
+        child.close()
+        conns.append(parent)
+        procs.append(proc)
+
+    stats = {'barriers': 0, 'courier_handovers': 0, 'order_handovers': 0}
+    orders_in = [[] for _ in conns]
+    t = 0.0
+    try:
+        while t < config.SIM_TIME:
+            t = min(config.SIM_TIME, t + window)
+            for conn, pending in zip(conns, orders_in):
+                conn.send(('run', (t, pending)))
+            replies = [conn.recv() for conn in conns]
+
+            couriers_in = [[] for _ in conns]
+            counts = [reply[1] for reply in replies]
+            free = [reply[2] for reply in replies]
+            queued = [reply[3] for reply in replies]
+            for reply in replies:
+                for state in reply[0]:
+                    dest = int(layout.region_of(state['dest'])[0])
+                    couriers_in[dest].append(state)
+                    counts[dest] += 1
+                    free[dest] += state['free']
+                    stats['courier_handovers'] += 1
+
+            # Na última barreira não há mais janela para o repasse de pedidos
+            last = t >= config.SIM_TIME
+            exports, spare = _plan_order_handover(counts, free, queued) if not last else ([0] * len(conns), [])
+            staffed = [s for s, count in enumerate(counts) if count]
+            for conn, shard_couriers, n_export in zip(conns, couriers_in, exports):
+                conn.send(('exchange', (shard_couriers, n_export)))
+            forwarded = [conn.recv() for conn in conns]
+
+            orders_in = [[] for _ in conns]
+            for shard_orders in forwarded:
+                for o in shard_orders:
+                    # Vai para a região mais próxima com entregadores livres sobrando
+                    candidates = [s for s, n in enumerate(spare) if n > 0] or staffed
+                    dest = min(candidates, key=lambda s: layout.distance(o['pickup'], s))
+                    if spare[dest] > 0:
+                        spare[dest] -= 1
+                    orders_in[dest].append(o)
+                    stats['order_handovers'] += 1
+            stats['barriers'] += 1
+
+        for conn in conns:
+            conn.send(('finish', ()))
+        results = [conn.recv() for conn in conns]
+    finally:
+        for proc in procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+
+    couriers, orders_queue, all_orders, metrics = _merge(results)
+    run = SimpleNamespace(now=results[0]['now'], shards=len(layout), grid=(layout.cols, layout.rows),
+                          window=window, **stats)
+    return run, couriers, orders_queue, all_orders, metrics
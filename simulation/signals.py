@@ -0,0 +1,17 @@
+class Signal:
+    """Evento reutilizável que acorda um processo SimPy quando algo muda"""
+    
+    def __init__(self, env):
+        self.env = env
+        self._event = env.event()
+    
+    def notify(self):
+        if self._event.processed:
+            self._event = self.env.event()
+        if not self._event.triggered:
+            self._event.succeed()
+    
+    def wait(self):
+        if self._event.processed:
+            self._event = self.env.event()
+        return self._event
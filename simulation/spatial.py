@@ -0,0 +1,101 @@
+import heapq
+import math
+
+
+class GridIndex:
+    """Índice espacial em grade uniforme para consultas de vizinhos mais próximos"""
+    
+    BRUTE_FORCE_LIMIT = 64
+    
+    def __init__(self, cell_size=100.0):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._where = {}
+        self._bounds = None
+    
+    def _cell(self, pos):
+        return (int(math.floor(pos[0] / self.cell_size)), int(math.floor(pos[1] / self.cell_size)))
+    
+    def insert(self, key, pos):
+        self.discard(key)
+        pos = (float(pos[0]), float(pos[1]))
+        cell = self._cell(pos)
+        self._cells.setdefault(cell, {})[key] = pos
+        self._where[key] = cell
+        
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            b = self._bounds
+            b[0] = min(b[0], cell[0])
+            b[1] = min(b[1], cell[1])
+            b[2] = max(b[2], cell[0])
+            b[3] = max(b[3], cell[1])
+    
+    def discard(self, key):
+        cell = self._where.pop(key, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self._cells[cell]
+        if not self._where:
+            self._bounds = None
+    
+    def position(self, key):
+        return self._cells[self._where[key]][key]
+    
+    def __contains__(self, key):
+        return key in self._where
+    
+    def __len__(self):
+        return len(self._where)
+    
+    def nearest(self, pos, k=1):
+        """Retorna até k pares (chave, distância) ordenados pela distância"""
+        if not self._where:
+            return []
+        
+        px, py = float(pos[0]), float(pos[1])
+        if len(self._where) <= self.BRUTE_FORCE_LIMIT:
+            found = [
+                (math.hypot(x - px, y - py), key)
+                for bucket in self._cells.values()
+                for key, (x, y) in bucket.items()
+            ]
+            found.sort(key=lambda item: item[0])
+            return [(key, d) for d, key in found[:k]]
+        
+        cx, cy = self._cell((px, py))
+        b = self._bounds
+        max_ring = max(abs(cx - b[0]), abs(cx - b[2]), abs(cy - b[1]), abs(cy - b[3]))
+        
+        found = []
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(cx, cy, ring):
+                bucket = self._cells.get(cell)
+                if bucket:
+                    for key, (x, y) in bucket.items():
+                        found.append((math.hypot(x - px, y - py), key))
+            
+            # Qualquer ponto fora dos anéis já visitados está a pelo menos ring * cell_size
+            if len(found) >= k:
+                kth = heapq.nsmallest(k, found, key=lambda item: item[0])[-1][0]
+                if kth <= ring * self.cell_size:
+                    break
+        
+        found = heapq.nsmallest(k, found, key=lambda item: item[0])
+        return [(key, d) for d, key in found]
+    
+    @staticmethod
+    def _ring_cells(cx, cy, ring):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for x in range(cx - ring, cx + ring + 1):
+            yield (x, cy - ring)
+            yield (x, cy + ring)
+        for y in range(cy - ring + 1, cy + ring):
+            yield (cx - ring, y)
+            yield (cx + ring, y)
@@ -0,0 +1,115 @@
+import os
+import csv
+import time
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .replication import make_config, derive_seeds, run_replication
+
+
+RESULT_COLUMNS = [
+    'success_rate',
+    'mean_delivery_time',
+    'p95_delivery_time',
+    'accidents',
+    'total_orders',
+    'completed',
+    'desisted',
+    'mean_utilization',
+]
+
+
+def parse_values(text, base_value):
+    """Converte '2,4,8' ou 'início:fim:passo' (fim inclusivo) para o tipo do valor em config"""
+    cast = type(base_value) if isinstance(base_value, (int, float)) and not isinstance(base_value, bool) else float
+    
+    if ':' in text:
+        start, stop, step = (float(v) for v in text.split(':'))
+        values = np.arange(start, stop + step / 2, step)
+        return [cast(round(v, 10)) for v in values]
+    return [cast(v) for v in text.split(',') if v.strip()]
+
+
+def parse_sweep_args(specs, base_config):
+    ranges = {}
+    for spec in specs:
+        name, _, text = spec.partition('=')
+        name = name.strip()
+        if not text or not hasattr(base_config, name):
+            raise ValueError(f"Parâmetro de varredura inválido: {spec!r}")
+        ranges[name] = parse_values(text, getattr(base_config, name))
+    return ranges
+
+
+def build_grid(ranges):
+    names = list(ranges)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(ranges[n] for n in names))]
+
+
+def _task_key(params, replication):
+    return tuple(str(v) for v in params.values()) + (str(replication),)
+
+
+def _load_done(path, names):
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='') as f:
+        return {
+            tuple(row[n] for n in names) + (row['replication'],)
+            for row in csv.DictReader(f)
+        }
+
+
+def run_sweep(base_config, ranges, output, replications=1, workers=None):
+    """Executa a grade cartesiana x replicações em paralelo, gravando uma linha por execução.
+    
+    Execuções já presentes em `output` são puladas, então uma varredura interrompida
+    pode ser retomada com o mesmo comando.
+    """
+    names = list(ranges)
+    grid = build_grid(ranges)
+    seeds = derive_seeds(base_config.SEED, replications)
+    done = _load_done(output, names)
+    
+    tasks = [
+        (params, rep, seed)
+        for params in grid
+        for rep, seed in enumerate(seeds)
+        if _task_key(params, rep) not in done
+    ]
+    total = len(grid) * replications
+    print(f"Varredura: {len(grid)} combinações x {replications} replicações = {total} execuções "
+          f"({total - len(tasks)} já concluídas)")
+    if not tasks:
+        return output
+    
+    write_header = not os.path.exists(output) or os.path.getsize(output) == 0
+    started = time.perf_counter()
+    
+    with open(output, 'a', newline='') as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=names + ['replication', 'seed'] + RESULT_COLUMNS)
+        if write_header:
+            writer.writeheader()
+        
+        futures = {
+            pool.submit(run_replication, make_config(base_config, SEED=seed, VERBOSE=False, **params)): (params, rep, seed)
+            for params, rep, seed in tasks
+        }
+        
+        for finished, future in enumerate(as_completed(futures), 1):
+            params, rep, seed = futures[future]
+            run = future.result()
+            
+            row = dict(params, replication=rep, seed=seed)
+            row.update({k: run[k] for k in RESULT_COLUMNS if k in run})
+            row['mean_utilization'] = float(np.mean(run['utilization'])) if run['utilization'] else 0.0
+            writer.writerow(row)
+            f.flush()
+            
+            elapsed = time.perf_counter() - started
+            eta = elapsed / finished * (len(tasks) - finished)
+            print(f"[{finished}/{len(tasks)}] {params} rep={rep} "
+                  f"sucesso={round(run['success_rate'], 1)}% - decorrido {elapsed:.0f}s, restante ~{eta:.0f}s")
+    
+    return output
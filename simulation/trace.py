@@ -0,0 +1,264 @@
+import io
+import os
+import json
+import queue
+import zipfile
+import threading
+import numpy as np
+
+
+ORDER_EVENTS = {'created': 0, 'assigned': 1, 'picked': 2, 'completed': 3, 'desisted': 4}
+COURIER_STATES = {'idle': 0, 'to_pickup': 1, 'to_dropoff': 2, 'accident': 3}
+
+ORDER_DTYPE = np.dtype([
+    ('time', 'f8'), ('event', 'u1'), ('order', 'i8'), ('courier', 'i4'),
+    ('x0', 'f4'), ('y0', 'f4'), ('x1', 'f4'), ('y1', 'f4'), ('value', 'f4'),
+])
+COURIER_DTYPE = np.dtype([
+    ('time', 'f8'), ('courier', 'i4'), ('state', 'u1'), ('x', 'f4'), ('y', 'f4'), ('order', 'i8'),
+])
+
+# Valor inicial de cada coluna; eventos que não usam o campo simplesmente não o escrevem
+_FILL = {'x0': np.nan, 'y0': np.nan, 'x1': np.nan, 'y1': np.nan, 'value': np.nan, 'order': -1, 'courier': -1}
+
+# Campos dos eventos 'created' lidos da OrderTable: (campo do trace, coluna da tabela)
+_CREATED_FIELDS = (
+    ('x0', 'pickup_x'), ('y0', 'pickup_y'), ('x1', 'dropoff_x'), ('y1', 'dropoff_y'),
+    ('value', 'base_priority'),
+)
+
+
+class _Buffer:
+    """Um array pré-alocado por campo, preenchido com atribuições escalares"""
+    __slots__ = ('dtype', 'columns', 'size')
+    
+    def __init__(self, dtype, capacity):
+        self.dtype = dtype
+        self.columns = self._allocate(capacity)
+        self.size = 0
+    
+    def _allocate(self, capacity):
+        return tuple(np.full(capacity, _FILL.get(field, 0), dtype=self.dtype[field]) for field in self.dtype.names)
+    
+    @property
+    def capacity(self):
+        return len(self.columns[0])
+    
+    def grow(self, capacity):
+        grown = self._allocate(capacity)
+        for dst, src in zip(grown, self.columns):
+            dst[:self.size] = src[:self.size]
+        self.columns = grown
+
+
+class TraceRecorder:
+    """Grava eventos de pedidos e mudanças de estado dos entregadores em buffers NumPy.
+    
+    Cada campo tem seu próprio array pré-alocado e cada evento vira poucas atribuições
+    escalares, sem montar linhas estruturadas no laço da simulação. Buffers cheios são
+    entregues a uma thread que grava cada coluna comprimida em um arquivo .npz (um array
+    por coluna e por bloco), sem bloquear a simulação.
+    
+    Até `max_pending` blocos aguardam a escrita; acima disso a simulação espera a thread.
+    Um erro de escrita é relançado no próximo bloco entregue ou em `close()`, e o arquivo
+    incompleto é apagado.
+    """
+    
+    def __init__(self, path, meta=None, chunk_size=65536, initial_size=4096, max_pending=4):
+        self.path = path
+        self.meta = meta or {}
+        self.chunk_size = chunk_size
+        self.initial_size = min(initial_size, chunk_size)
+        self._orders = _Buffer(ORDER_DTYPE, self.initial_size)
+        self._couriers = _Buffer(COURIER_DTYPE, self.initial_size)
+        self._chunks = {'orders': 0, 'couriers': 0}
+        self._order_table = None
+        self._error = None
+        self._error_raised = False
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+        self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+        self._writer.start()
+        self.closed = False
+    
+    def order_event(self, t, event, order, courier_id=-1):
+        buf = self._orders
+        i = buf.size
+        time, kind, oid, cid = buf.columns[:4]
+        time[i] = t
+        kind[i] = ORDER_EVENTS[event]
+        oid[i] = order.id
+        cid[i] = courier_id
+        if event == 'created':
+            # Coordenadas e prioridade já estão na OrderTable; _flush as copia em bloco
+            self._order_table = order.table
+        buf.size = i + 1
+        if i + 1 == len(time):
+            self._spill('orders')
+    
+    def courier_state(self, t, courier, state, pos):
+        """`pos` é a extremidade de trecho que o entregador já tem, sem interpolar courier.pos"""
+        buf = self._couriers
+        i = buf.size
+        time, cid, kind, x, y, oid = buf.columns
+        time[i] = t
+        cid[i] = courier.id
+        kind[i] = COURIER_STATES[state]
+        # tolist() evita converter escalares float64 para float32 um a um
+        x[i], y[i] = pos.tolist()
+        order = courier.current_order
+        if order is not None:
+            oid[i] = order.id
+        buf.size = i + 1
+        if i + 1 == len(time):
+            self._spill('couriers')
+    
+    def restored_state(self, t, orders_queue, couriers):
+        """Grava o estado de uma simulação retomada de checkpoint.
+    
+        Pedidos ainda vivos recebem seus eventos anteriores (criado, atribuído, coletado)
+        com os instantes originais, e cada entregador um registro de estado em `t`.
+        """
+        events = [(o.created, 'created', o, -1) for o in orders_queue]
+        for c in couriers:
+            if c.assigned_event is not None and c.assigned_event.triggered:
+                # Atribuído na pausa pós-entrega; o evento 'assigned' sai quando o processo o consumir
+                o = c.assigned_event.value
+                events.append((o.created, 'created', o, -1))
+            o = c.current_order
+            if o is None:
+                continue
+            events.append((o.created, 'created', o, -1))
+            events.append((o.assigned, 'assigned', o, c.id))
+            if o.picked is not None:
+                events.append((o.picked, 'picked', o, c.id))
+        events.sort(key=lambda e: (e[0], ORDER_EVENTS[e[1]], e[2].id))
+        for when, event, order, courier_id in events:
+            self.order_event(when, event, order, courier_id)
+    
+        for c in couriers:
+            state = "accident" if c.phase == "accident" else c.status
+            self.courier_state(t, c, state, c.pos)
+        self.meta['start_time'] = t
+    
+    def _spill(self, table):
+        # Dobra o buffer até chunk_size; a partir daí o bloco cheio vai para a thread de escrita
+        buf = self._orders if table == 'orders' else self._couriers
+        if buf.capacity < self.chunk_size:
+            buf.grow(min(2 * buf.capacity, self.chunk_size))
+        else:
+            self._flush(table)
+    
+    def _raise_error(self):
+        # A falha da thread de escrita chega ao chamador uma única vez
+        if self._error is not None and not self._error_raised:
+            self._error_raised = True
+            raise self._error
+    
+    def _flush(self, table):
+        self._raise_error()
+        buf = self._orders if table == 'orders' else self._couriers
+        if buf.size == 0:
+            return
+        if self._error is None:
+            columns = {field: col[:buf.size] for field, col in zip(buf.dtype.names, buf.columns)}
+            if table == 'orders' and self._order_table is not None:
+                self._fill_created(columns)
+            self._queue.put((table, self._chunks[table], columns))
+            self._chunks[table] += 1
+        fresh = _Buffer(buf.dtype, self.chunk_size)
+        if table == 'orders':
+            self._orders = fresh
+        else:
+            self._couriers = fresh
+    
+    def _fill_created(self, columns):
+        created = columns['event'] == ORDER_EVENTS['created']
+        ids = columns['order'][created]
+        for field, source in _CREATED_FIELDS:
+            columns[field][created] = self._order_table.column(source)[ids]
+    
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # Após uma falha só esvazia a fila, para put() não bloquear a simulação
+                continue
+            table, chunk, columns = item
+            try:
+                for field, values in columns.items():
+                    self._write_array(f"{table}.{field}.{chunk:05d}.npy", values, compress=field != 'time')
+            except Exception as e:
+                self._error = e
+    
+    def _write_array(self, name, arr, compress=True):
+        # Serializa em memória e comprime numa única chamada, evitando disputar o GIL em pedaços pequenos.
+        # Os tempos em float64 quase não comprimem (~10%) e seriam o maior custo de compressão
+        raw = io.BytesIO()
+        np.lib.format.write_array(raw, arr)
+        self._zip.writestr(name, raw.getvalue(), compress_type=None if compress else zipfile.ZIP_STORED)
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._flush('orders')
+            self._flush('couriers')
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+            if self._error is not None:
+                self._discard()
+        self._raise_error()
+        if self._error is not None:
+            return
+        meta = dict(self.meta, chunks=self._chunks)
+        self._write_array("meta.npy", np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8))
+        self._zip.close()
+    
+    def _discard(self):
+        # Sem meta.npy o trace não teria como ser lido; o arquivo parcial é removido
+        try:
+            self._zip.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def open_trace(config):
+    """Cria o gravador se TRACE_PATH estiver definido; o caminho aceita campos do config, ex. {SEED}"""
+    if not getattr(config, 'TRACE_PATH', None):
+        return None
+    values = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    meta = {
+        'sim_time': config.SIM_TIME,
+        'map_size': list(config.MAP_SIZE),
+        'seed': config.SEED,
+        'couriers': [],
+    }
+    return TraceRecorder(config.TRACE_PATH.format(**values), meta=meta)
+
+
+def load_trace(path):
+    """Lê um trace gravado e devolve {'meta', 'orders', 'couriers'} com arrays estruturados"""
+    with np.load(path) as data:
+        meta = json.loads(bytes(data['meta']).decode())
+        tables = {}
+        for table, dtype in (('orders', ORDER_DTYPE), ('couriers', COURIER_DTYPE)):
+            n_chunks = meta['chunks'][table]
+            columns = {
+                field: np.concatenate([data[f"{table}.{field}.{c:05d}"] for c in range(n_chunks)])
+                if n_chunks else np.empty(0, dtype=dtype[field])
+                for field in dtype.names
+            }
+            arr = np.empty(len(columns['time']), dtype=dtype)
+            for field, values in columns.items():
+                arr[field] = values
+            tables[table] = arr
+    return {'meta': meta, 'orders': tables['orders'], 'couriers': tables['couriers']}
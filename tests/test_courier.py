@@ -0,0 +1,25 @@
+import pickle
+
+import config
+from simulation import make_config, setup_simulation
+
+
+def test_detached_courier_never_runs_again():
+    cfg = make_config(config, VERBOSE=False, NUM_COURIERS=2, SIM_TIME=1200.0, TRACE_PATH=None, RESUME_FROM=None)
+    env, couriers, orders_queue, all_orders, metrics = setup_simulation(cfg)
+    env.run(until=300)
+
+    # Como no modo particionado: sai da lista do ambiente e o processo é encerrado
+    courier = couriers[0]
+    assert courier.phase == "travel"
+    courier.detach()
+    env.context['couriers'].remove(courier)
+    before = pickle.dumps(courier.snapshot())
+    created = metrics['total_orders']
+
+    env.run(until=cfg.SIM_TIME)
+
+    assert not courier._run_proc.is_alive
+    assert pickle.dumps(courier.snapshot()) == before
+    # O restante da simulação continua normalmente
+    assert metrics['total_orders'] > created
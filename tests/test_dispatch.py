@@ -0,0 +1,76 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from simulation import GridIndex
+from simulation.dispatch import build_score_matrix, solve_greedy, solve_greedy_indexed
+
+
+# Tamanhos em torno do limite da busca exaustiva (GridIndex.BRUTE_FORCE_LIMIT = 64)
+SIZES = (1, 7, 63, 64, 65, 66, 150, 400)
+
+
+def _points(rng, n, clustered=False):
+    if clustered:
+        centers = rng.uniform(0, 1400, size=(3, 2))
+        return centers[rng.integers(3, size=n)] + rng.normal(0, 40, size=(n, 2))
+    return rng.uniform(0, (1400, 800), size=(n, 2))
+
+
+@pytest.mark.parametrize("n", SIZES)
+@pytest.mark.parametrize("clustered", (False, True))
+def test_nearest_matches_brute_force(n, clustered):
+    rng = np.random.default_rng(n)
+    points = _points(rng, n, clustered)
+    index = GridIndex(cell_size=100.0)
+    for key, pos in enumerate(points.tolist()):
+        index.insert(key, pos)
+
+    # Consultas dentro e fora da área ocupada, inclusive longe da grade
+    for query in rng.uniform(-600, 2000, size=(40, 2)).tolist():
+        dist = [math.hypot(x - query[0], y - query[1]) for x, y in points.tolist()]
+        for k in (1, 5):
+            got = index.nearest(query, k)
+            want = sorted(range(n), key=dist.__getitem__)[:k]
+            assert [key for key, _ in got] == want
+            assert [d for _, d in got] == [dist[key] for key in want]
+
+
+def test_nearest_after_discard_crosses_limit():
+    rng = np.random.default_rng(0)
+    points = _points(rng, 70)
+    index = GridIndex(cell_size=100.0)
+    for key, pos in enumerate(points.tolist()):
+        index.insert(key, pos)
+    # Remove entregadores um a um, passando de busca em anéis para a exaustiva
+    for key in range(10):
+        index.discard(key)
+        query = rng.uniform(0, (1400, 800)).tolist()
+        remaining = range(key + 1, 70)
+        want = min(remaining, key=lambda k: math.hypot(*(points[k] - query)))
+        assert index.nearest(query)[0][0] == want
+
+
+@pytest.mark.parametrize("n_couriers", SIZES)
+@pytest.mark.parametrize("n_orders", (1, 30, 120))
+def test_indexed_greedy_matches_score_matrix(n_couriers, n_orders):
+    rng = np.random.default_rng(1000 * n_couriers + n_orders)
+    now = 500.0
+    orders = [
+        SimpleNamespace(pickup=tuple(p), created=float(c), base_priority=float(b))
+        for p, c, b in zip(_points(rng, n_orders).tolist(), rng.uniform(0, now, n_orders).tolist(),
+                           rng.choice((1.0, 2.0, 3.0), n_orders).tolist())
+    ]
+    positions = _points(rng, n_couriers, clustered=n_couriers % 2 == 0).tolist()
+    couriers = [SimpleNamespace(pos=pos) for pos in positions]
+
+    index = GridIndex(cell_size=100.0)
+    for col, pos in enumerate(positions):
+        index.insert(col, pos)
+
+    indexed = solve_greedy_indexed(orders, index, now)
+    matrix = solve_greedy(build_score_matrix(orders, couriers, now))
+    assert indexed == matrix
+    assert len(index) == n_couriers - len(matrix)
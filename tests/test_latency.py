@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from simulation import LatencyHistogram
+
+
+def _samples(n=100_000, seed=7):
+    return np.random.default_rng(seed).lognormal(mean=5.0, sigma=1.0, size=n)
+
+
+def test_merged_quantiles_match_numpy():
+    values = _samples()
+    left, right = LatencyHistogram(), LatencyHistogram()
+    for v in values[:40_000].tolist():
+        left.record(v)
+    for v in values[40_000:].tolist():
+        right.record(v)
+    merged = left + right
+
+    qs = (0.5, 0.95, 0.99)
+    for got, want in zip(merged.quantiles(qs), np.quantile(values, qs)):
+        assert got == pytest.approx(want, rel=merged.precision)
+    assert merged.quantile(0.95) == merged.quantiles((0.95,))[0]
+    assert merged.mean == pytest.approx(values.mean())
+    # __add__ não altera as parcelas
+    assert left.count == 40_000 and right.count == 60_000
+
+
+def test_merge_equals_single_histogram():
+    values = _samples(20_000).tolist()
+    single = LatencyHistogram()
+    parts = [LatencyHistogram() for _ in range(4)]
+    for i, v in enumerate(values):
+        single.record(v)
+        parts[i % 4].record(v)
+    merged = parts[0].copy()
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert np.array_equal(merged.counts, single.counts)
+    assert merged.count == single.count
+    assert merged.total == pytest.approx(single.total)
+    assert (merged.min, merged.max) == (single.min, single.max)
+    assert merged.quantiles() == single.quantiles()
+
+
+def test_values_outside_range_are_clamped():
+    h = LatencyHistogram(min_value=1.0, max_value=100.0, precision=0.05)
+    for v in (0.0, 0.5, 50.0, 1000.0, 5000.0):
+        h.record(v)
+
+    assert h.counts[0] == 2
+    assert h.counts[-1] == 2
+    assert h.counts.sum() == h.count == 5
+    # Fora da faixa o quantil sai na borda; a média e os extremos seguem exatos
+    assert h.quantile(0.0) == 1.0
+    # O balde de estouro começa logo acima de max_value
+    assert 100.0 <= h.quantile(1.0) <= 100.0 * (1 + h.precision) ** 2
+    assert h.mean == pytest.approx(6050.5 / 5)
+    assert (h.min, h.max) == (0.0, 5000.0)
+    edges, counts = h.bins()
+    assert edges[0] == 0.0 and edges[-1] == 5000.0
+    assert counts.sum() == 5
+
+
+def test_merge_rejects_different_configuration():
+    with pytest.raises(ValueError):
+        LatencyHistogram(precision=0.01).merge(LatencyHistogram(precision=0.02))
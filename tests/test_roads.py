@@ -0,0 +1,29 @@
+import config
+from simulation import make_config, run_headless, save_checkpoint, load_checkpoint, setup_simulation
+
+
+def _config(**overrides):
+    values = dict(VERBOSE=False, SIM_TIME=900.0, NUM_COURIERS=3, ROAD_NETWORK="grid",
+                  TRACE_PATH=None, RESUME_FROM=None)
+    values.update(overrides)
+    return make_config(config, **values)
+
+
+def test_route_cache_stats_include_courier_routes():
+    env, couriers, orders_queue, all_orders, metrics = run_headless(_config())
+    roads = env.context['roads']
+    # Courier.route() também consulta o cache depois do último despacho
+    assert metrics['route_cache_hits'] == roads.hits
+    assert metrics['route_cache_misses'] == roads.misses
+    assert metrics['route_cache_hits'] + metrics['route_cache_misses'] > 0
+
+
+def test_checkpoint_keeps_route_cache_stats(tmp_path):
+    path = tmp_path / "ck.pkl"
+    env, couriers, orders_queue, all_orders, metrics = setup_simulation(_config())
+    env.run(until=450.0)
+    save_checkpoint(env, str(path))
+    roads = env.context['roads']
+    state = load_checkpoint(str(path))
+    assert state['metrics']['route_cache_hits'] == roads.hits
+    assert state['metrics']['route_cache_misses'] == roads.misses
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from simulation import MetricSeries
+
+
+def _random_series(seed, horizon=500.0, n=400):
+    rng = np.random.default_rng(seed)
+    series = MetricSeries(bucket_size=10.0, capacity=4)
+    for t in np.sort(rng.uniform(0, horizon, n)).tolist():
+        series.record(MetricSeries.COUNTERS[rng.integers(len(MetricSeries.COUNTERS))], t)
+    return series
+
+
+def test_counters_and_gauge_means():
+    series = MetricSeries(bucket_size=10.0)
+    for kind, t in (('created', 2.0), ('created', 4.0), ('assigned', 6.0), ('completed', 15.0)):
+        series.record(kind, t)
+
+    assert len(series) == 2
+    assert series.counts('created').tolist() == [2, 0]
+    assert series.counts('completed').tolist() == [0, 1]
+    # Fila: 1 em [2,4), 2 em [4,6), 1 de 6 em diante; ocupados: 1 em [6,15)
+    assert series.mean('queue', now=20.0) == pytest.approx([1.0, 1.0])
+    assert series.mean('busy') == pytest.approx([0.4, 0.5])
+
+
+def test_add_keeps_counts_and_gauge_means():
+    a, b = _random_series(1), _random_series(2, horizon=300.0)
+    for series in (a, b):
+        series.advance(500.0)
+    merged = a + b
+
+    assert len(merged) == max(len(a), len(b))
+    for kind in MetricSeries.COUNTERS:
+        expected = np.zeros(len(merged), dtype=np.int64)
+        expected[:len(a)] += a.counts(kind)
+        expected[:len(b)] += b.counts(kind)
+        assert np.array_equal(merged.counts(kind), expected), kind
+    for gauge in MetricSeries.GAUGES:
+        assert merged.mean(gauge) == pytest.approx(a.mean(gauge) + b.mean(gauge)), gauge
+    assert (merged.queue, merged.busy) == (a.queue + b.queue, a.busy + b.busy)
+
+
+def test_rebin_keeps_totals():
+    series = _random_series(3)
+    coarse = series.rebin(7, 500.0)
+    for kind in MetricSeries.COUNTERS:
+        assert len(coarse[kind]) == 7
+        assert coarse[kind].sum() == series.counts(kind).sum(), kind
+
+    series = MetricSeries(bucket_size=10.0)
+    series.record('created', 2.0)
+    series.record('completed', 15.0)
+    assert series.rebin(4, 20.0)['created'].tolist() == [1, 0, 0, 0]
+    assert series.rebin(4, 20.0)['completed'].tolist() == [0, 0, 1, 0]
+
+
+def test_add_rejects_different_bucket_size():
+    with pytest.raises(ValueError):
+        MetricSeries(10.0) + MetricSeries(5.0)
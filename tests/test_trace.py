@@ -0,0 +1,137 @@
+import errno
+
+import numpy as np
+import pytest
+
+import config
+from simulation import (make_config, setup_simulation, run_headless, save_checkpoint,
+                        TraceRecorder, load_trace)
+from simulation.trace import ORDER_EVENTS, COURIER_STATES
+from visualization.replay import TraceReplay
+
+
+def _config(**overrides):
+    values = dict(VERBOSE=False, SIM_TIME=1800.0, TRACE_PATH=None, RESUME_FROM=None)
+    values.update(overrides)
+    return make_config(config, **values)
+
+
+def _record(cfg, path, **sizes):
+    trace = TraceRecorder(str(path), **sizes)
+    env, couriers, orders_queue, all_orders, metrics = setup_simulation(cfg, trace)
+    env.run(until=cfg.SIM_TIME)
+    trace.close()
+    return load_trace(str(path)), metrics
+
+
+def test_small_chunks_match_single_chunk(tmp_path):
+    cfg = _config()
+    whole, _ = _record(cfg, tmp_path / "whole.npz")
+    # Buffers minúsculos: cresce 4 → 8 → ... → 64 e depois grava um bloco a cada 64 linhas
+    chunked, _ = _record(cfg, tmp_path / "chunked.npz", chunk_size=64, initial_size=4)
+
+    assert whole['meta']['chunks'] == {'orders': 1, 'couriers': 1}
+    assert chunked['meta']['chunks']['orders'] > 1
+    assert chunked['meta']['chunks']['couriers'] > 1
+    for table in ('orders', 'couriers'):
+        assert len(chunked[table]) == len(whole[table])
+        for field in whole[table].dtype.names:
+            assert np.array_equal(chunked[table][field], whole[table][field], equal_nan=True), (table, field)
+
+
+def test_write_failure_fails_the_run(tmp_path, monkeypatch):
+    write_array = TraceRecorder._write_array
+    fail_from = {'chunk': 2}
+
+    def disk_full(self, name, arr, compress=True):
+        # A partir do bloco fail_from['chunk'] de cada tabela a gravação falha
+        if name != "meta.npy" and int(name.split('.')[2]) >= fail_from['chunk']:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        write_array(self, name, arr, compress)
+
+    monkeypatch.setattr(TraceRecorder, '_write_array', disk_full)
+    cfg = _config(SIM_TIME=3600.0)
+
+    # Falha no meio da execução: a simulação para no próximo bloco entregue à thread
+    path = tmp_path / "mid.npz"
+    trace = TraceRecorder(str(path), chunk_size=64, initial_size=4, max_pending=2)
+    env, couriers, orders_queue, all_orders, metrics = setup_simulation(cfg, trace)
+    with pytest.raises(OSError) as raised:
+        env.run(until=cfg.SIM_TIME)
+    assert raised.value.errno == errno.ENOSPC
+    assert env.now < cfg.SIM_TIME
+    trace.close()
+    assert trace._queue.empty()
+    assert not path.exists()
+
+    # Execução curta, com o único bloco gravado por close(): o erro sai de run_headless
+    fail_from['chunk'] = 0
+    path = tmp_path / "end.npz"
+    with pytest.raises(OSError):
+        run_headless(_config(TRACE_PATH=str(path)))
+    assert not path.exists()
+
+
+def test_headless_trace_matches_metrics(tmp_path):
+    path = tmp_path / "run.npz"
+    cfg = _config(NUM_COURIERS=5, TRACE_PATH=str(path))
+    env, couriers, orders_queue, all_orders, metrics = run_headless(cfg)
+    trace = load_trace(str(path))
+
+    ev = trace['orders']
+    counts = {name: int((ev['event'] == code).sum()) for name, code in ORDER_EVENTS.items()}
+    assert counts['created'] == metrics['total_orders'] == len(all_orders)
+    assert counts['assigned'] == metrics['assigned']
+    assert counts['completed'] == metrics['completed']
+    assert counts['desisted'] == metrics['desisted']
+    assert np.all(np.diff(ev['time']) >= 0)
+
+    created = ev[ev['event'] == ORDER_EVENTS['created']]
+    assert np.array_equal(created['order'], np.arange(len(all_orders)))
+    assert np.allclose(created['x0'], all_orders.column('pickup_x'))
+
+    states = trace['couriers']
+    assert int((states['state'] == COURIER_STATES['accident']).sum()) == metrics['accidents']
+    assert trace['meta']['couriers'] == [c.name for c in couriers]
+
+
+def test_resumed_trace_replays(tmp_path):
+    checkpoint = tmp_path / "ck.pkl"
+    cfg = _config(NUM_COURIERS=3)
+    env, couriers, orders_queue, all_orders, metrics = setup_simulation(cfg)
+    env.run(until=900.0)
+    save_checkpoint(env, str(checkpoint))
+
+    path = tmp_path / "resumed.npz"
+    resumed = _config(NUM_COURIERS=3, RESUME_FROM=str(checkpoint), TRACE_PATH=str(path))
+    env, couriers, orders_queue, all_orders, metrics = run_headless(resumed)
+
+    replay = TraceReplay(str(path))
+    assert replay.start_time == 900.0
+    # Cada entregador tem um registro de estado no instante da retomada
+    assert sorted(replay.meta['couriers']) == sorted(c.name for c in couriers)
+    for t in np.linspace(replay.start_time, replay.end_time, 50):
+        replay.seek(t)
+    replay.seek(replay.end_time)
+    assert sorted(o.id for o in replay.queue) == sorted(o.id for o in orders_queue)
+    for courier, replayed in zip(couriers, replay.couriers):
+        assert replayed.status == courier.status
+        expected = None if courier.current_order is None else courier.current_order.id
+        assert (None if replayed.current_order is None else replayed.current_order.id) == expected
+
+
+def test_resume_continues_like_uninterrupted_run(tmp_path):
+    checkpoint = tmp_path / "ck.pkl"
+    cfg = _config(NUM_COURIERS=3)
+    env, _, _, _, _ = setup_simulation(cfg)
+    env.run(until=900.0)
+    save_checkpoint(env, str(checkpoint))
+    env.run(until=cfg.SIM_TIME)
+    continuous = env.context
+
+    _, _, _, all_orders, metrics = run_headless(_config(NUM_COURIERS=3, RESUME_FROM=str(checkpoint)))
+
+    for key in ('total_orders', 'assigned', 'completed', 'desisted', 'accidents', 'total_delivery_time'):
+        assert metrics[key] == continuous['metrics'][key], key
+    for name in all_orders.COLUMNS:
+        assert np.array_equal(all_orders.column(name), continuous['all_orders'].column(name), equal_nan=True), name
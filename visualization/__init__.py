@@ -1,4 +1,5 @@
 from .renderer import Renderer
-from .ui import UIController
+from .ui import UIController, ReplayController
+from .replay import TraceReplay
 
-__all__ = ['Renderer', 'UIController']
\ No newline at end of file
+__all__ = ['Renderer', 'UIController', 'ReplayController', 'TraceReplay']
\ No newline at end of file
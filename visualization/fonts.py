@@ -0,0 +1,52 @@
+import json
+import os
+import pygame
+
+
+def resolve_fonts(faces, cache_path=None):
+    """Caminhos da fonte regular e negrito para `faces` ("Segoe UI,Arial"), com cache em JSON.
+
+    A primeira busca varre as fontes do sistema (fc-list no Linux), o que custa centenas de
+    milissegundos; o resultado fica salvo em `cache_path` e é reaproveitado enquanto os
+    arquivos existirem. None significa a fonte padrão do pygame.
+    """
+    path = os.path.expanduser(cache_path) if cache_path else None
+    cache = {}
+    if path:
+        try:
+            with open(path, encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+    entry = cache.get(faces)
+    if entry is not None and all(p is None or os.path.exists(p) for p in entry.values()):
+        return entry
+
+    entry = {
+        'regular': pygame.font.match_font(faces),
+        'bold': pygame.font.match_font(faces, bold=True),
+    }
+    cache[faces] = entry
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+        except OSError:
+            pass
+    return entry
+
+
+def load_fonts(specs, faces, cache_path=None):
+    """Cria uma fonte por (tamanho, negrito) em `specs`, como pygame.font.SysFont faria"""
+    entry = resolve_fonts(faces, cache_path)
+    fonts = []
+    for size, bold in specs:
+        path = entry['bold'] if bold else entry['regular']
+        font = pygame.font.Font(path, size)
+        # Sem arquivo negrito próprio, o negrito é sintetizado como no SysFont
+        if bold and (path is None or path == entry['regular']):
+            font.set_bold(True)
+        fonts.append(font)
+    return fonts
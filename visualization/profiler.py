@@ -0,0 +1,83 @@
+import csv
+import time
+from collections import deque
+
+
+class FrameProfiler:
+    """Tempo de cada fase do quadro: passo da simulação e cada etapa do Renderer.draw.
+
+    Só mede quando o HUD está visível ou há arquivo de saída; fora disso `lap` retorna
+    no primeiro teste. Guarda os últimos `window` quadros de cada fase para médias e
+    piores casos, e com `path` grava uma linha CSV por quadro, em milissegundos.
+    """
+
+    def __init__(self, window=120, path=None):
+        self.window = window
+        self.hud = False
+        self.frames = 0
+        self._history = {}
+        self._current = {}
+        self._start = None
+        self._last = None
+        self._file = None
+        self._writer = None
+        self._columns = None
+        if path:
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+
+    @property
+    def enabled(self):
+        return self.hud or self._file is not None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {}
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase):
+        """Atribui a `phase` o tempo desde a marca anterior do quadro"""
+        if self._start is None:
+            return
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def end_frame(self, sim_time=0.0):
+        if self._start is None:
+            return
+        self._current['total'] = time.perf_counter() - self._start
+        self._start = None
+
+        for phase, seconds in self._current.items():
+            history = self._history.get(phase)
+            if history is None:
+                history = self._history[phase] = deque(maxlen=self.window)
+            history.append(seconds)
+
+        if self._writer is not None:
+            # Colunas fixadas no primeiro quadro; fases ausentes num quadro valem 0
+            if self._columns is None:
+                self._columns = list(self._current)
+                self._writer.writerow(['frame', 'sim_time'] + [f'{phase}_ms' for phase in self._columns])
+            self._writer.writerow([self.frames, round(sim_time, 3)] +
+                                  [round(self._current.get(phase, 0.0) * 1000, 4) for phase in self._columns])
+        self.frames += 1
+
+    def stats(self):
+        """[(fase, média ms, pior ms), ...] na ordem do quadro, com o total no fim"""
+        rows = []
+        for phase, history in self._history.items():
+            if phase != 'total':
+                rows.append((phase, sum(history) / len(history) * 1000, max(history) * 1000))
+        total = self._history.get('total')
+        if total:
+            rows.append(('total', sum(total) / len(total) * 1000, max(total) * 1000))
+        return rows
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
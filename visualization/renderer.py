@@ -3,9 +3,19 @@ import math
 import random
 import os
 
+from .fonts import load_fonts
+from .profiler import FrameProfiler
+
 
 class Renderer:
     
+    # Superfícies estáticas guardadas entre quadros (painéis, rótulos, sombras)
+    SURFACE_CACHE_SIZE = 256
+    # Níveis do pulso do alerta de pico
+    PULSE_STEPS = 40
+    # Cores da camada estática; mudar qualquer uma (ou MAP_SIZE) redesenha a camada
+    STATIC_COLORS = ('background', 'background_light', 'grid', 'grid_major')
+    
     def __init__(self, config):
         self.config = config
         self.screen = None
@@ -16,22 +26,26 @@ class Renderer:
         self.time = 0
         self.particles = []
         self.courier_images = []
-        
-    def initialize(self):
+        self.profiler = FrameProfiler(config.FRAME_PROFILE_WINDOW, config.FRAME_PROFILE_PATH)
+        self._surface_cache = {}
+        self._static_layer = None
+        self._static_key = None
+        self._trail_layer = None
+        self._trail_dirty = None
+        self._trail_fades = {}
+        
+    def initialize(self, profile=None):
         pygame.init()
         self.screen = pygame.display.set_mode(self.config.MAP_SIZE)
         pygame.display.set_caption("🚀 Flash Move - Simulação de Delivery")
+        if profile is not None:
+            profile.mark("janela (pygame.init + display)")
         
-        try:
-            self.title_font = pygame.font.SysFont("Segoe UI", 18, bold=True)
-            self.font = pygame.font.SysFont("Segoe UI", 13)
-            self.small_font = pygame.font.SysFont("Segoe UI", 11)
-            self.alert_font = pygame.font.SysFont("Segoe UI", 24, bold=True)
-        except:
-            self.title_font = pygame.font.SysFont("Arial", 18, bold=True)
-            self.font = pygame.font.SysFont("Arial", 13)
-            self.small_font = pygame.font.SysFont("Arial", 11)
-            self.alert_font = pygame.font.SysFont("Arial", 24, bold=True)
+        self.title_font, self.font, self.small_font, self.alert_font = load_fonts(
+            ((18, True), (13, False), (11, False), (24, True)),
+            self.config.FONT_FACES, self.config.FONT_CACHE_PATH)
+        if profile is not None:
+            profile.mark("fontes")
         
         if self.config.BACKGROUND_IMAGE:
             try:
@@ -41,29 +55,59 @@ class Renderer:
                 self.bg_image = None
         
         self._load_courier_images()
+        if profile is not None:
+            profile.mark("imagens")
     
     def draw(self, env, couriers, orders_queue, metrics, paused=False, speed_mult=1.0):
         self.time += 0.1
         
-        self._draw_background()
-        
-        if self.bg_image:
-            self.screen.blit(self.bg_image, (0, 0))
+        lap = self.profiler.lap
         
-        self._draw_grid()
+        self._draw_static_layer()
+        lap('background')
         self._update_particles(couriers)
+        lap('update_particles')
         self._draw_particles()
+        lap('particles')
         self._draw_orders(orders_queue, env)
+        lap('orders')
         self._draw_courier_trails(couriers)
+        lap('courier_trails')
         self._draw_couriers(couriers, env)
+        lap('couriers')
         self._draw_connections(couriers)
+        lap('connections')
         self._draw_header()
+        lap('header')
         self._draw_metrics_panel(env, orders_queue, metrics, couriers, paused, speed_mult)
+        lap('metrics_panel')
         self._draw_courier_status_panel(couriers)
+        lap('courier_status_panel')
         self._draw_pending_orders_panel(env, orders_queue, couriers)
+        lap('pending_orders_panel')
         self._draw_peak_alert(metrics, env)
+        lap('peak_alert')
+        
+        if self.profiler.hud:
+            self._draw_profiler_hud()
+        lap('profiler_hud')
+    
+    def _draw_static_layer(self):
+        """Gradiente de fundo, imagem de fundo e grade, desenhados uma vez numa camada"""
+        colors = self.config.COLORS
+        key = (tuple(self.config.MAP_SIZE), tuple(colors[name] for name in self.STATIC_COLORS))
+        if key != self._static_key:
+            layer = pygame.Surface(self.config.MAP_SIZE).convert()
+            self._draw_background(layer)
+            if self.bg_image:
+                if self.bg_image.get_size() != key[0]:
+                    self.bg_image = pygame.transform.scale(self.bg_image, self.config.MAP_SIZE)
+                layer.blit(self.bg_image, (0, 0))
+            self._draw_grid(layer)
+            self._static_layer, self._static_key = layer, key
+        self.screen.blit(self._static_layer, (0, 0))
     
-    def _draw_background(self):
+    def _draw_background(self, surface):
         # Gradiente de fundo mais suave e escuro
         for y in range(0, self.config.MAP_SIZE[1], 8):
             factor = y / self.config.MAP_SIZE[1]
@@ -81,30 +125,30 @@ class Renderer:
             g = int(g * vignette)
             b = int(b * vignette)
             
-            pygame.draw.rect(self.screen, (r, g, b), (0, y, self.config.MAP_SIZE[0], 8))
+            pygame.draw.rect(surface, (r, g, b), (0, y, self.config.MAP_SIZE[0], 8))
     
-    def _draw_grid(self):
+    def _draw_grid(self, surface):
         # Grid com efeito de profundidade
         for i in range(0, self.config.MAP_SIZE[0], 50):
             # Linhas verticais com gradiente
             for y in range(0, self.config.MAP_SIZE[1], 50):
                 alpha = int(25 + 10 * math.sin(y / 100))
                 color = (*self.config.COLORS['grid'][:3], alpha) if len(self.config.COLORS['grid']) == 3 else self.config.COLORS['grid']
-                pygame.draw.line(self.screen, color, (i, y), (i, min(y + 50, self.config.MAP_SIZE[1])), 1)
+                pygame.draw.line(surface, color, (i, y), (i, min(y + 50, self.config.MAP_SIZE[1])), 1)
         
         for i in range(0, self.config.MAP_SIZE[1], 50):
             # Linhas horizontais com gradiente
             for x in range(0, self.config.MAP_SIZE[0], 50):
                 alpha = int(25 + 10 * math.sin(x / 100))
                 color = (*self.config.COLORS['grid'][:3], alpha) if len(self.config.COLORS['grid']) == 3 else self.config.COLORS['grid']
-                pygame.draw.line(self.screen, color, (x, i), (min(x + 50, self.config.MAP_SIZE[0]), i), 1)
+                pygame.draw.line(surface, color, (x, i), (min(x + 50, self.config.MAP_SIZE[0]), i), 1)
         
         # Grid maior (major) com mais destaque
         for i in range(0, self.config.MAP_SIZE[0], 200):
-            pygame.draw.line(self.screen, self.config.COLORS['grid_major'], 
+            pygame.draw.line(surface, self.config.COLORS['grid_major'], 
                            (i, 0), (i, self.config.MAP_SIZE[1]), 1)
         for i in range(0, self.config.MAP_SIZE[1], 200):
-            pygame.draw.line(self.screen, self.config.COLORS['grid_major'], 
+            pygame.draw.line(surface, self.config.COLORS['grid_major'], 
                            (0, i), (self.config.MAP_SIZE[0], i), 1)
     
     def _draw_header(self):
@@ -112,22 +156,16 @@ class Renderer:
         header_rect = pygame.Rect(0, 0, self.config.MAP_SIZE[0], header_height)
         
         # Gradiente no header
-        header_surf = pygame.Surface((self.config.MAP_SIZE[0], header_height), pygame.SRCALPHA)
-        for y in range(header_height):
-            factor = y / header_height
-            alpha = int(230 - factor * 50)
-            r = int(20 + factor * 15)
-            g = int(25 + factor * 15)
-            b = int(35 + factor * 15)
-            pygame.draw.line(header_surf, (r, g, b, alpha), (0, y), (self.config.MAP_SIZE[0], y))
+        header_surf = self._cached_surface(
+            ('header', self.config.MAP_SIZE[0], header_height),
+            lambda: self._header_gradient(self.config.MAP_SIZE[0], header_height))
         self.screen.blit(header_surf, (0, 0))
         
         # Linha de borda com brilho
-        glow_surf = pygame.Surface((self.config.MAP_SIZE[0], 6), pygame.SRCALPHA)
-        for i in range(3):
-            alpha = 80 - i * 25
-            pygame.draw.line(glow_surf, (*self.config.COLORS['accent'], alpha), 
-                           (0, i), (self.config.MAP_SIZE[0], i), 1)
+        accent = self.config.COLORS['accent']
+        glow_surf = self._cached_surface(
+            ('header_glow', self.config.MAP_SIZE[0], accent),
+            lambda: self._header_glow(self.config.MAP_SIZE[0], accent))
         self.screen.blit(glow_surf, (0, header_height - 3))
         
         # Título com efeito de brilho
@@ -152,6 +190,24 @@ class Renderer:
         subtitle = self.small_font.render("Simulação de Sistema de Delivery", True, self.config.COLORS['text_dim'])
         self.screen.blit(subtitle, (22, 38))
     
+    def _header_gradient(self, width, height):
+        surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        for y in range(height):
+            factor = y / height
+            alpha = int(230 - factor * 50)
+            r = int(20 + factor * 15)
+            g = int(25 + factor * 15)
+            b = int(35 + factor * 15)
+            pygame.draw.line(surf, (r, g, b, alpha), (0, y), (width, y))
+        return surf
+    
+    def _header_glow(self, width, accent):
+        surf = pygame.Surface((width, 6), pygame.SRCALPHA)
+        for i in range(3):
+            alpha = 80 - i * 25
+            pygame.draw.line(surf, (*accent, alpha), (0, i), (width, i), 1)
+        return surf
+    
     def _draw_orders(self, orders_queue, env):
         for o in list(orders_queue):
             px, py = int(o.pickup[0]), int(o.pickup[1])
@@ -213,28 +269,10 @@ class Renderer:
             bg_rect = label_rect.inflate(10, 6)
             
             # Sombra do label
-            shadow_surf = pygame.Surface((bg_rect.width + 4, bg_rect.height + 4), pygame.SRCALPHA)
-            self._draw_rounded_rect(shadow_surf, pygame.Rect(2, 2, bg_rect.width, bg_rect.height), (0, 0, 0, 80), 8)
-            self.screen.blit(shadow_surf, (bg_rect.x - 2, bg_rect.y - 2))
-            
-            # Fundo do label com gradiente
-            label_surf = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
-            for y in range(bg_rect.height):
-                factor = y / bg_rect.height
-                alpha = int(200 + 55 * factor)
-                pygame.draw.line(label_surf, (*color, alpha), (0, y), (bg_rect.width, y))
-            
-            # Aplicar bordas arredondadas
-            mask = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, bg_rect.width, bg_rect.height), border_radius=8)
-            for x in range(bg_rect.width):
-                for y in range(bg_rect.height):
-                    mask_alpha = mask.get_at((x, y))[3]
-                    if mask_alpha > 0:
-                        current = label_surf.get_at((x, y))
-                        label_surf.set_at((x, y), (*current[:3], int(current[3] * mask_alpha / 255)))
+            self.screen.blit(self._rounded_shadow(bg_rect.size, 2, 8, 80), (bg_rect.x - 2, bg_rect.y - 2))
             
-            self.screen.blit(label_surf, bg_rect)
+            # Fundo do label com gradiente e bordas arredondadas
+            self.screen.blit(self._rounded_gradient(bg_rect.size, 8, (*color, 200), (*color, 255)), bg_rect)
             pygame.draw.rect(self.screen, (*color, 255), bg_rect, 2, border_radius=8)
             self.screen.blit(label, label_rect)
     
@@ -242,23 +280,47 @@ class Renderer:
         if not self.config.SHOW_TRAILS:
             return
         
+        # Uma camada compartilhada por todas as trilhas; a cada quadro só a área suja do
+        # quadro anterior é limpa e só a área desenhada agora vai para a tela
+        layer = self._trail_layer
+        if layer is None or layer.get_size() != tuple(self.config.MAP_SIZE):
+            layer = self._trail_layer = pygame.Surface(self.config.MAP_SIZE, pygame.SRCALPHA)
+        elif self._trail_dirty is not None:
+            layer.fill((0, 0, 0, 0), self._trail_dirty)
+        
+        trails = []
         for c in couriers:
-            if len(c.trail) > 1:
-                trail_color = self._get_courier_color(c.id)
-                for i in range(len(c.trail) - 1):
-                    progress = i / len(c.trail)
-                    alpha = int(self.config.COLORS['trail_alpha'] * progress)
-                    color_with_alpha = (*trail_color, alpha)
-                    
-                    trail_surf = pygame.Surface((self.config.MAP_SIZE[0], self.config.MAP_SIZE[1]), pygame.SRCALPHA)
-                    thickness = max(2, int(5 * progress))
-                    
-                    # Desenhar brilho da trilha
-                    glow_thickness = thickness + 4
-                    pygame.draw.line(trail_surf, (*trail_color, int(alpha * 0.3)), 
-                                   c.trail[i], c.trail[i + 1], glow_thickness)
-                    pygame.draw.line(trail_surf, color_with_alpha, c.trail[i], c.trail[i + 1], thickness)
-                    self.screen.blit(trail_surf, (0, 0))
+            trail = c.trail
+            if len(trail) > 1:
+                trails.append((trail, self._get_courier_color(c.id), self._trail_fade(len(trail))))
+        
+        # Todos os brilhos antes dos núcleos: na camada o último traço sobrescreve o pixel,
+        # e o brilho de um trecho não pode apagar o núcleo de outro
+        dirty = []
+        for trail, trail_color, fade in trails:
+            for i, (glow_alpha, _, thickness) in enumerate(fade):
+                dirty.append(pygame.draw.line(layer, (*trail_color, glow_alpha),
+                                              trail[i], trail[i + 1], thickness + 4))
+        for trail, trail_color, fade in trails:
+            for i, (_, alpha, thickness) in enumerate(fade):
+                pygame.draw.line(layer, (*trail_color, alpha), trail[i], trail[i + 1], thickness)
+        
+        self._trail_dirty = dirty[0].unionall(dirty) if dirty else None
+        if self._trail_dirty is not None:
+            self.screen.blit(layer, self._trail_dirty.topleft, self._trail_dirty)
+    
+    def _trail_fade(self, length):
+        """(alfa do brilho, alfa, espessura) de cada trecho de uma trilha com `length` pontos"""
+        key = (length, self.config.COLORS['trail_alpha'])
+        fade = self._trail_fades.get(key)
+        if fade is None:
+            fade = []
+            for i in range(length - 1):
+                progress = i / length
+                alpha = int(self.config.COLORS['trail_alpha'] * progress)
+                fade.append((int(alpha * 0.3), alpha, max(2, int(5 * progress))))
+            self._trail_fades[key] = fade
+        return fade
     
     def _draw_couriers(self, couriers, env):
         for c in couriers:
@@ -365,28 +427,10 @@ class Renderer:
                 bg_rect = order_rect.inflate(12, 8)
                 
                 # Sombra do badge
-                shadow_surf = pygame.Surface((bg_rect.width + 6, bg_rect.height + 6), pygame.SRCALPHA)
-                self._draw_rounded_rect(shadow_surf, pygame.Rect(3, 3, bg_rect.width, bg_rect.height), (0, 0, 0, 100), 10)
-                self.screen.blit(shadow_surf, (bg_rect.x - 3, bg_rect.y - 3))
-                
-                # Fundo com gradiente
-                badge_surf = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
-                for y_pos in range(bg_rect.height):
-                    factor = y_pos / bg_rect.height
-                    alpha = int(220 + 35 * factor)
-                    pygame.draw.line(badge_surf, (*color, alpha), (0, y_pos), (bg_rect.width, y_pos))
-                
-                # Aplicar bordas arredondadas
-                mask = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
-                pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, bg_rect.width, bg_rect.height), border_radius=10)
-                for x_pos in range(bg_rect.width):
-                    for y_pos in range(bg_rect.height):
-                        mask_alpha = mask.get_at((x_pos, y_pos))[3]
-                        if mask_alpha > 0:
-                            current = badge_surf.get_at((x_pos, y_pos))
-                            badge_surf.set_at((x_pos, y_pos), (*current[:3], int(current[3] * mask_alpha / 255)))
+                self.screen.blit(self._rounded_shadow(bg_rect.size, 3, 10, 100), (bg_rect.x - 3, bg_rect.y - 3))
                 
-                self.screen.blit(badge_surf, bg_rect)
+                # Fundo com gradiente e bordas arredondadas
+                self.screen.blit(self._rounded_gradient(bg_rect.size, 10, (*color, 220), (*color, 255)), bg_rect)
                 
                 # Borda brilhante
                 border_pulse = abs(math.sin(self.time * 4)) * 0.4 + 0.6
@@ -439,7 +483,7 @@ class Renderer:
     
     def _draw_metrics_panel(self, env, orders_queue, metrics, couriers, paused, speed_mult):
         panel_width = 380
-        panel_height = 500
+        panel_height = 572
         panel_x = 20
         panel_y = 80
         
@@ -447,39 +491,15 @@ class Renderer:
         panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
         
         shadow_offset = 4
-        shadow_surf = pygame.Surface((panel_width + shadow_offset * 2, panel_height + shadow_offset * 2), pygame.SRCALPHA)
-        shadow_rect = pygame.Rect(shadow_offset, shadow_offset, panel_width, panel_height)
         for i in range(3):
             alpha = 30 - i * 8
             shadow_size = shadow_offset + i * 2
-            shadow_blur = pygame.Surface((panel_width + shadow_size * 2, panel_height + shadow_size * 2), pygame.SRCALPHA)
-            pygame.draw.rect(shadow_blur, (0, 0, 0, alpha), 
-                           (shadow_size, shadow_size, panel_width, panel_height), 
-                           border_radius=card_radius)
+            shadow_blur = self._rounded_shadow((panel_width, panel_height), shadow_size, card_radius, alpha)
             self.screen.blit(shadow_blur, (panel_x - shadow_size, panel_y - shadow_size))
         
-        panel_surf = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
         bg_top = (50, 53, 60, 245)
         bg_bottom = (40, 43, 50, 250)
-        
-        for y in range(panel_height):
-            factor = y / panel_height
-            r = int(bg_top[0] + (bg_bottom[0] - bg_top[0]) * factor)
-            g = int(bg_top[1] + (bg_bottom[1] - bg_top[1]) * factor)
-            b = int(bg_top[2] + (bg_bottom[2] - bg_top[2]) * factor)
-            a = int(bg_top[3] + (bg_bottom[3] - bg_top[3]) * factor)
-            pygame.draw.line(panel_surf, (r, g, b, a), (0, y), (panel_width, y))
-        
-        mask = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, panel_width, panel_height), border_radius=card_radius)
-        
-        for x in range(panel_width):
-            for y in range(panel_height):
-                mask_alpha = mask.get_at((x, y))[3]
-                if mask_alpha < 255:
-                    current_color = panel_surf.get_at((x, y))
-                    panel_surf.set_at((x, y), (*current_color[:3], int(current_color[3] * mask_alpha / 255)))
-        
+        panel_surf = self._rounded_gradient((panel_width, panel_height), card_radius, bg_top, bg_bottom)
         self.screen.blit(panel_surf, (panel_x, panel_y))
         
         inner_padding = 24
@@ -575,9 +595,26 @@ class Renderer:
                                content_x, y_offset, soft_text_color)
         y_offset += mobile_line_height
         
+        latency = metrics.get('delivery_latency')
+        if latency is not None and latency.count:
+            p50, p95, p99 = latency.quantiles((0.5, 0.95, 0.99))
+            self._draw_metric_line(f"📐 p50/p95/p99: {round(p50)} / {round(p95)} / {round(p99)}s",
+                                   content_x, y_offset, soft_text_color)
+        y_offset += mobile_line_height
+        
         self._draw_metric_line(f"📊 Utilização: {round(utilization, 1)}%", 
                                content_x, y_offset, soft_text_color)
-        y_offset += mobile_line_height + 20
+        y_offset += mobile_line_height + 8
+        
+        # Fila média por balde nos últimos minutos, lida direto da série temporal
+        timeline = metrics.get('timeline')
+        if timeline is not None and len(timeline):
+            queue = timeline.mean('queue', env.now)[-60:]
+            self._draw_metric_line(f"📉 Fila (últimos {round(len(queue) * timeline.bucket_size / 60)} min)",
+                                   content_x, y_offset, soft_text_color, self.small_font)
+            self._draw_sparkline(queue, pygame.Rect(content_x + 170, y_offset, content_width - 170, 28),
+                                 self.config.COLORS['warning'])
+        y_offset += 40
         
         controls_title = self.font.render("🎮 Controles", True, soft_text_color)
         self.screen.blit(controls_title, (content_x, y_offset))
@@ -606,34 +643,12 @@ class Renderer:
         for i in range(3):
             alpha = 30 - i * 8
             shadow_size = shadow_offset + i * 2
-            shadow_blur = pygame.Surface((panel_width + shadow_size * 2, panel_height + shadow_size * 2), pygame.SRCALPHA)
-            pygame.draw.rect(shadow_blur, (0, 0, 0, alpha), 
-                           (shadow_size, shadow_size, panel_width, panel_height), 
-                           border_radius=card_radius)
+            shadow_blur = self._rounded_shadow((panel_width, panel_height), shadow_size, card_radius, alpha)
             self.screen.blit(shadow_blur, (panel_x - shadow_size, panel_y - shadow_size))
         
-        panel_surf = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
         bg_top = (50, 53, 60, 245)
         bg_bottom = (40, 43, 50, 250)
-        
-        for y in range(panel_height):
-            factor = y / panel_height
-            r = int(bg_top[0] + (bg_bottom[0] - bg_top[0]) * factor)
-            g = int(bg_top[1] + (bg_bottom[1] - bg_top[1]) * factor)
-            b = int(bg_top[2] + (bg_bottom[2] - bg_top[2]) * factor)
-            a = int(bg_top[3] + (bg_bottom[3] - bg_top[3]) * factor)
-            pygame.draw.line(panel_surf, (r, g, b, a), (0, y), (panel_width, y))
-        
-        mask = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, panel_width, panel_height), border_radius=card_radius)
-        
-        for x in range(panel_width):
-            for y in range(panel_height):
-                mask_alpha = mask.get_at((x, y))[3]
-                if mask_alpha < 255:
-                    current_color = panel_surf.get_at((x, y))
-                    panel_surf.set_at((x, y), (*current_color[:3], int(current_color[3] * mask_alpha / 255)))
-        
+        panel_surf = self._rounded_gradient((panel_width, panel_height), card_radius, bg_top, bg_bottom)
         self.screen.blit(panel_surf, (panel_x, panel_y))
         
         inner_padding = 20
@@ -740,34 +755,12 @@ class Renderer:
         for i in range(3):
             alpha = 30 - i * 8
             shadow_size = shadow_offset + i * 2
-            shadow_blur = pygame.Surface((panel_width + shadow_size * 2, panel_height + shadow_size * 2), pygame.SRCALPHA)
-            pygame.draw.rect(shadow_blur, (0, 0, 0, alpha), 
-                           (shadow_size, shadow_size, panel_width, panel_height), 
-                           border_radius=card_radius)
+            shadow_blur = self._rounded_shadow((panel_width, panel_height), shadow_size, card_radius, alpha)
             self.screen.blit(shadow_blur, (panel_x - shadow_size, panel_y - shadow_size))
         
-        panel_surf = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
         bg_top = (50, 53, 60, 245)
         bg_bottom = (40, 43, 50, 250)
-        
-        for y in range(panel_height):
-            factor = y / panel_height
-            r = int(bg_top[0] + (bg_bottom[0] - bg_top[0]) * factor)
-            g = int(bg_top[1] + (bg_bottom[1] - bg_top[1]) * factor)
-            b = int(bg_top[2] + (bg_bottom[2] - bg_top[2]) * factor)
-            a = int(bg_top[3] + (bg_bottom[3] - bg_top[3]) * factor)
-            pygame.draw.line(panel_surf, (r, g, b, a), (0, y), (panel_width, y))
-        
-        mask = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, panel_width, panel_height), border_radius=card_radius)
-        
-        for x in range(panel_width):
-            for y in range(panel_height):
-                mask_alpha = mask.get_at((x, y))[3]
-                if mask_alpha < 255:
-                    current_color = panel_surf.get_at((x, y))
-                    panel_surf.set_at((x, y), (*current_color[:3], int(current_color[3] * mask_alpha / 255)))
-        
+        panel_surf = self._rounded_gradient((panel_width, panel_height), card_radius, bg_top, bg_bottom)
         self.screen.blit(panel_surf, (panel_x, panel_y))
         
         inner_padding = 20
@@ -810,12 +803,7 @@ class Renderer:
                 order_color = self.config.COLORS['order_new']
                 priority_text = "Baixa"
             
-            card_surf = pygame.Surface((content_width, card_height), pygame.SRCALPHA)
-            card_bg = (*order_color, 40)
-            pygame.draw.rect(card_surf, card_bg, (0, 0, content_width, card_height), border_radius=12)
-            pygame.draw.rect(card_surf, order_color, (0, 0, content_width, card_height), width=2, border_radius=12)
-            
-            self.screen.blit(card_surf, (content_x, y_offset))
+            self.screen.blit(self._order_card((content_width, card_height), order_color), (content_x, y_offset))
             
             order_id_text = f"#{order.id}"
             order_id_label = self.font.render(order_id_text, True, self.config.COLORS['text'])
@@ -873,9 +861,66 @@ class Renderer:
         label = font.render(text, True, color)
         self.screen.blit(label, (x, y))
     
+    def _draw_sparkline(self, values, rect, color):
+        if len(values) < 2:
+            return
+        top = max(1.0, float(values.max()))
+        step = rect.width / (len(values) - 1)
+        points = [(rect.x + i * step, rect.bottom - rect.height * v / top) for i, v in enumerate(values)]
+        pygame.draw.line(self.screen, (*self.config.COLORS['text_dim'], 80), rect.bottomleft, rect.bottomright)
+        pygame.draw.lines(self.screen, color, False, points, 2)
+    
     def _draw_rounded_rect(self, surface, rect, color, radius):
         pygame.draw.rect(surface, color, rect, border_radius=radius)
     
+    def _cached_surface(self, key, build):
+        """Superfície estática reaproveitada entre quadros; `build` só roda na primeira vez"""
+        surf = self._surface_cache.get(key)
+        if surf is None:
+            if len(self._surface_cache) >= self.SURFACE_CACHE_SIZE:
+                self._surface_cache.clear()
+            surf = self._surface_cache[key] = build()
+        return surf
+    
+    def _rounded_gradient(self, size, radius, top, bottom):
+        """Retângulo arredondado com gradiente vertical de `top` a `bottom` (RGBA)"""
+        def build():
+            width, height = size
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            for y in range(height):
+                factor = y / height
+                color = tuple(int(t + (b - t) * factor) for t, b in zip(top, bottom))
+                pygame.draw.line(surf, color, (0, y), (width, y))
+            # Cantos: multiplica o alfa por uma máscara opaca só dentro do retângulo arredondado
+            mask = pygame.Surface(size, pygame.SRCALPHA)
+            mask.fill((255, 255, 255, 0))
+            pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, width, height), border_radius=radius)
+            surf.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            return surf
+        return self._cached_surface(('gradient', tuple(size), radius, top, bottom), build)
+    
+    def _rounded_shadow(self, size, offset, radius, alpha):
+        """Sombra de um retângulo arredondado, com `offset` de margem em volta"""
+        def build():
+            width, height = size
+            surf = pygame.Surface((width + offset * 2, height + offset * 2), pygame.SRCALPHA)
+            pygame.draw.rect(surf, (0, 0, 0, alpha), (offset, offset, width, height), border_radius=radius)
+            return surf
+        return self._cached_surface(('shadow', tuple(size), offset, radius, alpha), build)
+    
+    def _rounded_border(self, size, radius, color, width):
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(surf, color, (0, 0, *size), width=width, border_radius=radius)
+        return surf
+    
+    def _order_card(self, size, color):
+        def build():
+            card = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(card, (*color, 40), (0, 0, *size), border_radius=12)
+            pygame.draw.rect(card, color, (0, 0, *size), width=2, border_radius=12)
+            return card
+        return self._cached_surface(('card', tuple(size), color), build)
+    
     def _draw_dashed_line(self, start, end, color, dash_length=10):
         x1, y1 = start
         x2, y2 = end
@@ -967,38 +1012,20 @@ class Renderer:
         alert_x = (self.config.MAP_SIZE[0] - alert_width) // 2
         alert_y = 70
         
+        # Pulso em passos de 1/PULSE_STEPS, para que cada nível seja desenhado uma vez só
         pulse = abs(math.sin(self.time * 3)) * 0.2 + 0.8
+        pulse = round(pulse * self.PULSE_STEPS) / self.PULSE_STEPS
         
-        shadow_surf = pygame.Surface((alert_width + 10, alert_height + 10), pygame.SRCALPHA)
-        pygame.draw.rect(shadow_surf, (0, 0, 0, 100), (5, 5, alert_width, alert_height), border_radius=20)
-        self.screen.blit(shadow_surf, (alert_x - 5, alert_y - 5))
+        self.screen.blit(self._rounded_shadow((alert_width, alert_height), 5, 20, 100), (alert_x - 5, alert_y - 5))
         
-        alert_surf = pygame.Surface((alert_width, alert_height), pygame.SRCALPHA)
         danger_color = self.config.COLORS['danger']
-        
-        for y in range(alert_height):
-            factor = y / alert_height
-            alpha = int(220 + 35 * factor)
-            r = int(danger_color[0] * pulse)
-            g = int(danger_color[1] * pulse)
-            b = int(danger_color[2] * pulse)
-            pygame.draw.line(alert_surf, (r, g, b, alpha), (0, y), (alert_width, y))
-        
-        mask = pygame.Surface((alert_width, alert_height), pygame.SRCALPHA)
-        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, alert_width, alert_height), border_radius=20)
-        
-        for x in range(alert_width):
-            for y in range(alert_height):
-                mask_alpha = mask.get_at((x, y))[3]
-                if mask_alpha < 255:
-                    current_color = alert_surf.get_at((x, y))
-                    alert_surf.set_at((x, y), (*current_color[:3], int(current_color[3] * mask_alpha / 255)))
-        
+        rgb = tuple(int(c * pulse) for c in danger_color)
+        alert_surf = self._rounded_gradient((alert_width, alert_height), 20, (*rgb, 220), (*rgb, 255))
         self.screen.blit(alert_surf, (alert_x, alert_y))
         
-        border_surf = pygame.Surface((alert_width, alert_height), pygame.SRCALPHA)
-        pygame.draw.rect(border_surf, (*danger_color, int(255 * pulse)), 
-                        (0, 0, alert_width, alert_height), width=3, border_radius=20)
+        border_surf = self._cached_surface(
+            ('alert_border', alert_width, alert_height, danger_color, pulse),
+            lambda: self._rounded_border((alert_width, alert_height), 20, (*danger_color, int(255 * pulse)), 3))
         self.screen.blit(border_surf, (alert_x, alert_y))
         
         alert_text = "🔥 PICO DE PEDIDOS! 🔥"
@@ -1013,6 +1040,41 @@ class Renderer:
             time_rect = time_surface.get_rect(center=(alert_x + alert_width // 2, alert_y + alert_height // 2 + 18))
             self.screen.blit(time_surface, time_rect)
     
+    def _draw_profiler_hud(self):
+        rows = self.profiler.stats()
+        if not rows:
+            return
+        
+        line_height = 15
+        width = 330
+        height = 36 + line_height * len(rows)
+        x = (self.config.MAP_SIZE[0] - width) // 2
+        y = self.config.MAP_SIZE[1] - height - 20
+        
+        hud_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(hud_surf, (10, 12, 18, 220), (0, 0, width, height), border_radius=10)
+        pygame.draw.rect(hud_surf, (*self.config.COLORS['accent'], 160), (0, 0, width, height), width=1, border_radius=10)
+        self.screen.blit(hud_surf, (x, y))
+        
+        dim = self.config.COLORS['text_dim']
+        self._draw_metric_line("fase (F3)", x + 12, y + 10, dim, self.small_font)
+        self._draw_metric_line("média", x + 170, y + 10, dim, self.small_font)
+        self._draw_metric_line("pior", x + 230, y + 10, dim, self.small_font)
+        self._draw_metric_line(f"ms/{self.profiler.window}q", x + 275, y + 10, dim, self.small_font)
+        for i, (phase, mean, worst) in enumerate(rows):
+            if phase == 'total':
+                color = self.config.COLORS['accent']
+            elif worst > 1000 / self.config.FPS:
+                color = self.config.COLORS['danger']
+            elif mean > 2.0:
+                color = self.config.COLORS['warning']
+            else:
+                color = self.config.COLORS['text']
+            row_y = y + 28 + i * line_height
+            self._draw_metric_line(phase, x + 12, row_y, color, self.small_font)
+            self._draw_metric_line(f"{mean:6.2f}", x + 170, row_y, color, self.small_font)
+            self._draw_metric_line(f"{worst:6.2f}", x + 230, row_y, color, self.small_font)
+    
     def _load_courier_images(self):
         assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets')
         courier_image_files = ['Pedro.jpg', 'Barreto.png']
@@ -1031,4 +1093,5 @@ class Renderer:
                 self.courier_images.append(placeholder)
     
     def cleanup(self):
+        self.profiler.close()
         pygame.quit()
@@ -0,0 +1,211 @@
+import numpy as np
+from simulation.trace import ORDER_EVENTS, COURIER_STATES, load_trace
+
+_CREATED, _ASSIGNED, _PICKED, _COMPLETED, _DESISTED = (
+    ORDER_EVENTS[k] for k in ('created', 'assigned', 'picked', 'completed', 'desisted')
+)
+_IDLE, _TO_PICKUP, _TO_DROPOFF, _ACCIDENT = (
+    COURIER_STATES[k] for k in ('idle', 'to_pickup', 'to_dropoff', 'accident')
+)
+_STATUS_NAMES = {_IDLE: "idle", _TO_PICKUP: "to_pickup", _TO_DROPOFF: "to_dropoff"}
+
+
+class ReplayClock:
+    __slots__ = ('now',)
+    
+    def __init__(self, now=0.0):
+        self.now = now
+
+
+class ReplayOrder:
+    __slots__ = ('id', 'pickup', 'dropoff', 'created', 'base_priority')
+    
+    def __init__(self, oid, pickup, dropoff, created, base_priority):
+        self.id = oid
+        self.pickup = pickup
+        self.dropoff = dropoff
+        self.created = created
+        self.base_priority = base_priority
+
+
+class ReplayCourier:
+    __slots__ = ('id', 'name', 'pos', 'status', 'current_order', 'had_accident',
+                 'total_deliveries', 'total_busy_time', 'trail')
+    
+    def __init__(self, cid, name):
+        self.id = cid
+        self.name = name
+        self.pos = np.zeros(2)
+        self.status = "idle"
+        self.current_order = None
+        self.had_accident = False
+        self.total_deliveries = 0
+        self.total_busy_time = 0.0
+        self.trail = []
+
+
+class _CourierTrack:
+    """Waypoints de um entregador; entre dois waypoints em movimento a posição é linear"""
+    
+    def __init__(self, rows, orders, cid):
+        self.times = rows['time']
+        self.xy = np.column_stack((rows['x'], rows['y'])).astype(float)
+        self.state = rows['state']
+        self.order = rows['order']
+        moving = (self.state == _TO_PICKUP) | (self.state == _TO_DROPOFF)
+        self.moving = moving & (np.arange(len(rows)) < len(rows) - 1)
+        
+        # Durante o acidente o status exibido continua sendo o do trecho interrompido
+        status = self.state.copy()
+        for i in np.flatnonzero(status == _ACCIDENT):
+            status[i] = status[i - 1] if i > 0 else _IDLE
+        self.status = status
+        
+        done = orders['completed_by'] == cid
+        by_completion = np.argsort(orders['completed'][done], kind='stable')
+        self.completed_times = orders['completed'][done][by_completion]
+        busy = (orders['completed'] - orders['assigned'])[done][by_completion]
+        self.busy_cumsum = np.concatenate(([0.0], np.cumsum(busy)))
+    
+    def index_at(self, t):
+        return np.searchsorted(self.times, t, side='right') - 1
+    
+    def positions_at(self, ts):
+        idx = np.maximum(self.index_at(ts), 0)
+        nxt = np.minimum(idx + 1, len(self.times) - 1)
+        span = self.times[nxt] - self.times[idx]
+        frac = np.where(self.moving[idx] & (span > 0), (ts - self.times[idx]) / np.where(span > 0, span, 1.0), 0.0)
+        frac = np.clip(frac, 0.0, 1.0)[..., None]
+        return self.xy[idx] + (self.xy[nxt] - self.xy[idx]) * frac
+
+
+class TraceReplay:
+    """Reconstrói o estado da simulação em qualquer instante a partir de um trace gravado.
+    
+    Contadores e posições usam busca binária sobre os arrays ordenados por tempo; a fila
+    usa keyframes a cada `keyframe_every` eventos, então um salto custa O(log n + k).
+    """
+    
+    def __init__(self, trace, keyframe_every=256, trail_step=0.2, trail_len=20):
+        if isinstance(trace, str):
+            trace = load_trace(trace)
+        self.meta = trace['meta']
+        self.keyframe_every = keyframe_every
+        self.trail_step = trail_step
+        self.trail_len = trail_len
+        ev = trace['orders']
+        
+        created = ev[ev['event'] == _CREATED]
+        n = int(ev['order'].max()) + 1 if len(ev) else 0
+        orders = {name: np.full(n, np.nan) for name in ('assigned', 'completed', 'desisted')}
+        orders['completed_by'] = np.full(n, -1, dtype=np.int64)
+        for code, name in ((_ASSIGNED, 'assigned'), (_COMPLETED, 'completed'), (_DESISTED, 'desisted')):
+            rows = ev[ev['event'] == code]
+            orders[name][rows['order']] = rows['time']
+            if code == _COMPLETED:
+                orders['completed_by'][rows['order']] = rows['courier']
+        # Por id: um trace de execução retomada não tem a criação de pedidos já encerrados
+        self._orders = {
+            int(r['order']): ReplayOrder(int(r['order']), (float(r['x0']), float(r['y0'])),
+                                         (float(r['x1']), float(r['y1'])), float(r['time']), float(r['value']))
+            for r in created
+        }
+        
+        self._event_times = {code: ev['time'][ev['event'] == code] for code in ORDER_EVENTS.values()}
+        done = ev[ev['event'] == _COMPLETED]
+        created_time = np.full(n, np.nan)
+        created_time[created['order']] = created['time']
+        delivery = np.nan_to_num(done['time'] - created_time[done['order']])
+        self._delivery_cumsum = np.concatenate(([0.0], np.cumsum(delivery)))
+        
+        self._build_queue_index(ev)
+        
+        cw = trace['couriers']
+        self._accident_times = cw['time'][cw['state'] == _ACCIDENT]
+        names = self.meta.get('couriers') or []
+        n_couriers = max(len(names), int(cw['courier'].max()) + 1 if len(cw) else 0)
+        self.couriers = []
+        self._tracks = []
+        for cid in range(n_couriers):
+            self.couriers.append(ReplayCourier(cid, names[cid] if cid < len(names) else f"Courier {cid}"))
+            self._tracks.append(_CourierTrack(cw[cw['courier'] == cid], orders, cid))
+        
+        self.start_time = float(self.meta.get('start_time', 0.0))
+        self.end_time = float(max(self.meta.get('sim_time', 0.0), ev['time'][-1] if len(ev) else 0.0))
+        self.clock = ReplayClock(self.start_time)
+        self.queue = []
+        self.metrics = {}
+        self.seek(self.start_time)
+    
+    def _build_queue_index(self, ev):
+        # Entra na fila ao ser criado e sai ao ser atribuído ou desistir
+        mask = np.isin(ev['event'], (_CREATED, _ASSIGNED, _DESISTED))
+        rows = ev[mask]
+        self._queue_times = rows['time']
+        self._queue_ids = rows['order']
+        self._queue_adds = rows['event'] == _CREATED
+        
+        keyframes = []
+        queue = {}
+        for i, (oid, add) in enumerate(zip(self._queue_ids.tolist(), self._queue_adds.tolist())):
+            if i % self.keyframe_every == 0:
+                keyframes.append(list(queue))
+            if add:
+                queue[oid] = None
+            else:
+                queue.pop(oid, None)
+        self._keyframes = keyframes or [[]]
+    
+    def _queue_at(self, t):
+        i = int(np.searchsorted(self._queue_times, t, side='right'))
+        k = min(i // self.keyframe_every, len(self._keyframes) - 1)
+        queue = dict.fromkeys(self._keyframes[k])
+        for j in range(k * self.keyframe_every, i):
+            oid = int(self._queue_ids[j])
+            if self._queue_adds[j]:
+                queue[oid] = None
+            else:
+                queue.pop(oid, None)
+        return [self._orders[oid] for oid in queue if oid in self._orders]
+    
+    def _count(self, code, t):
+        return int(np.searchsorted(self._event_times[code], t, side='right'))
+    
+    def seek(self, t):
+        """Posiciona o replay no instante t e atualiza relógio, entregadores, fila e métricas"""
+        t = min(max(float(t), self.start_time), self.end_time)
+        self.clock.now = t
+        
+        trail_ts = t - self.trail_step * np.arange(self.trail_len - 1, -1, -1)
+        trail_ts = trail_ts[trail_ts >= 0]
+        for courier, track in zip(self.couriers, self._tracks):
+            if not len(track.times):
+                continue
+            i = max(int(track.index_at(t)), 0)
+            state = track.state[i]
+            courier.status = _STATUS_NAMES[int(track.status[i])]
+            courier.had_accident = state == _ACCIDENT and t < track.times[min(i + 1, len(track.times) - 1)]
+            oid = int(track.order[i])
+            courier.current_order = self._orders.get(oid) if courier.status != "idle" else None
+            courier.pos = track.positions_at(np.array([t]))[0]
+            courier.trail = [tuple(p) for p in track.positions_at(trail_ts)]
+            done = int(np.searchsorted(track.completed_times, t, side='right'))
+            courier.total_deliveries = done
+            courier.total_busy_time = float(track.busy_cumsum[done])
+        
+        self.queue = self._queue_at(t)
+        completed = self._count(_COMPLETED, t)
+        peak = self.meta.get('peak_window')
+        self.metrics = {
+            'total_orders': self._count(_CREATED, t),
+            'assigned': self._count(_ASSIGNED, t),
+            'completed': completed,
+            'desisted': self._count(_DESISTED, t),
+            'in_progress': sum(1 for c in self.couriers if c.current_order is not None),
+            'accidents': int(np.searchsorted(self._accident_times, t, side='right')),
+            'total_delivery_time': float(self._delivery_cumsum[completed]),
+            'peak_start': peak[0] if peak else 0,
+            'peak_end': peak[1] if peak else 0,
+            'peak_active': bool(peak) and peak[0] <= t < peak[1],
+        }
+        return self
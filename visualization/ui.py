@@ -3,11 +3,13 @@ import pygame
 
 class UIController:
     
-    def __init__(self):
+    def __init__(self, max_speed=10.0):
         self.clock = pygame.time.Clock()
         self.running = True
         self.paused = False
         self.speed_mult = 1.0
+        self.max_speed = max_speed
+        self.show_profiler = False
     
     def process_events(self):
         for event in pygame.event.get():
@@ -22,14 +24,51 @@ class UIController:
                 elif event.key == pygame.K_SPACE:
                     self.paused = not self.paused
                 elif event.key == pygame.K_EQUALS or event.key == pygame.K_PLUS:
-                    self.speed_mult = min(10.0, self.speed_mult * 1.5)
+                    self.speed_mult = min(self.max_speed, self.speed_mult * 1.5)
                 elif event.key == pygame.K_MINUS:
                     self.speed_mult = max(0.25, self.speed_mult / 1.5)
+                elif event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+                else:
+                    self.handle_key(event.key)
         
         return True
     
+    def handle_key(self, key):
+        pass
+    
     def tick(self, fps=60):
         self.clock.tick(fps)
     
     def flip_display(self):
         pygame.display.flip()
+
+
+class ReplayController(UIController):
+    """Controles do replay: R inverte, ←/→ saltam 60s, PgUp/PgDn 600s, Home/End vão ao início/fim"""
+    
+    SEEK_KEYS = {
+        pygame.K_LEFT: -60.0,
+        pygame.K_RIGHT: 60.0,
+        pygame.K_PAGEDOWN: -600.0,
+        pygame.K_PAGEUP: 600.0,
+    }
+    
+    def __init__(self, max_speed=512.0):
+        super().__init__(max_speed)
+        self.direction = 1.0
+        self.seek_delta = 0.0
+    
+    def handle_key(self, key):
+        if key == pygame.K_r:
+            self.direction = -self.direction
+        elif key in self.SEEK_KEYS:
+            self.seek_delta += self.SEEK_KEYS[key]
+        elif key == pygame.K_HOME:
+            self.seek_delta = float('-inf')
+        elif key == pygame.K_END:
+            self.seek_delta = float('inf')
+    
+    def take_seek(self):
+        delta, self.seek_delta = self.seek_delta, 0.0
+        return delta